@@ -6,53 +6,548 @@ Sys编译器 GUI 界面 v3.0
 """
 
 import tkinter as tk
-from tkinter import ttk, scrolledtext, filedialog, messagebox
-import subprocess
+from tkinter import ttk, scrolledtext, messagebox
 import os
 import sys
 import threading
-import time
-
-class ModernButton(tk.Canvas):
-    """现代化按钮"""
-    def __init__(self, parent, text, color, hover_color, command=None, width=120, height=36):
-        super().__init__(parent, width=width, height=height, bg=parent['bg'],
-                        highlightthickness=0, relief=tk.FLAT)
-        self.command = command
-        self.text = text
-        self.color = color
-        self.hover_color = hover_color
-        self.original_color = color
+import concurrent.futures
+import collections
+import functools
+import hashlib
+import itertools
+import pathlib
+import queue
+import re
+
+# 脚本所在目录，编译器和示例文件的相对路径都以它为准
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 编译器路径 - 自动检测平台（Windows使用相对路径，不带./）
+# sys.platform 是解释器编译时确定的常量，不必像 platform.system() 那样查询系统信息
+COMPILER_PATH = "build/sysc.exe" if sys.platform == 'win32' else "build/sysc"
+
+# 编译输出使用的颜色标签（标签名即前景色）
+OUTPUT_COLORS = ("#4ec9b0", "#007acc", "#107c10", "#d13438", "#d83b01",
+                 "#888", "#cccccc", "#ff6b6b")
+
+# 编译器 -pipeline 模式下各阶段输出的起止标记，结束标记带该阶段的退出码
+PIPELINE_BEGIN_RE = re.compile(r'===BEGIN:(\w+)===$')
+PIPELINE_END_RE = re.compile(r'===END:(\w+):(\d+)===$')
+
+# 编译结果缓存保留的份数
+COMPILE_CACHE_SIZE = 8
+
+# 界面更新队列的轮询间隔(毫秒)和每次最多处理的事件数
+UI_TICK_MS = 16
+UI_EVENTS_PER_TICK = 200
+
+# 超过该长度的阶段输出在编译输出中只显示首尾若干行，点击后再完整格式化
+LARGE_OUTPUT_SIZE = 64 * 1024
+LARGE_OUTPUT_PREVIEW_LINES = 10
+
+# 编译输出最多保留的行数，超出时从顶部删除最早的内容
+COMPILE_OUTPUT_MAX_LINES = 5000
+
+# 程序运行结果中的计算过程只显示开头和结尾各若干步
+CALC_STEPS_PREVIEW = 5
+
+# Token表格行: | 类型 | 内容 | 行号 |，捕获前两列（多行模式下对整个输出逐行匹配，不跨行）
+TOKEN_ROW_RE = re.compile(
+    r'^\|(?!\+)[^\S\n]*([^|\n]*?)[^\S\n]*\|[^\S\n]*([^|\n]*?)[^\S\n]*(?:\||$)', re.M)
+
+# Token类型到设计报告格式的映射，{0} 为原值，{1} 为大写值
+TOKEN_FORMATS = {
+    'KEYWORD': 'KEYWORD_{1}',
+    'IDENTIFIER': 'IDENTIFIER({0})',
+    'NUMBER': 'NUMBER({0})',
+    'FLOAT': 'FLOAT({0})',
+    'OPERATOR': 'OPERATOR_{0}',
+    'SYMBOL': 'SYMBOL_{0}',
+}
+
+# 简单格式Token行(KEYWORD int 1)允许的类型
+TOKEN_TYPES = frozenset({'KEYWORD', 'OPERATOR', 'SYMBOL', 'NUMBER', 'FLOAT',
+                         'IDENTIFIER', 'UNKNOWN'})
+
+# Token表格行中去掉首尾空白后的非空单元格
+TOKEN_FIELD_RE = re.compile(r'[^|\s](?:[^|]*[^|\s])?')
+
+# Token输出中需要跳过的分隔线和标题行
+TOKEN_SKIP_RE = re.compile(r'^[=+-]|Token 类型|内容|行号|词法分析|目标|识别')
+
+# 编译器输出中各阶段的标题行（46个'='开头并含阶段序号），按序号索引
+SECTION_HEADER_RES = {n: re.compile(rf'^={{46}}.*{n}\.') for n in (3, 5, 6)}
+
+# 输出中是否出现return（不区分大小写，避免生成整个输出的小写副本）
+RETURN_RE = re.compile(r'return', re.IGNORECASE)
+
+# 章节结束的分隔线
+SECTION_END_RE = re.compile(r'^(?:===|━)', re.M)
+
+# 汇编阶段输出的分类: 编译输出中的标题、汇编页签的起始行、结束行和需跳过的行
+ASM_HEADER_RE = re.compile(r'目标代码|汇编')
+ASM_START_RE = re.compile(r'汇编|Assembly|\.section|global main')
+ASM_END_RE = re.compile(r'编译完成|目标代码已保存')
+ASM_SKIP_RE = re.compile(r'^(?:===|━)|目标代码')
+
+def iter_lines(text):
+    """逐行迭代文本，结果与 text.split('\\n') 相同，但不预先生成整个列表，可提前结束"""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+@functools.lru_cache(maxsize=16)
+def format_token_sequence(output):
+    """把词法分析的Token表格转换为设计报告格式，每行3个Token（结果按输出缓存）"""
+    # 一次匹配出整个输出中的Token表格行，按类型转换为设计报告格式
+    token_sequence = [
+        TOKEN_FORMATS.get(token_type, '{2}({0})').format(token_value, token_value.upper(), token_type)
+        for token_type, token_value in TOKEN_ROW_RE.findall(output)
+        if token_type not in ('Token 类型', '---')
+    ]
+
+    # 每行显示3个Token
+    return '\n'.join('  '.join(token_sequence[i:i + 3])
+                     for i in range(0, len(token_sequence), 3))
+
+
+# 中间代码表达式的二元运算，按匹配优先顺序排列: (运算符, 匹配条件, 求值函数)
+# 求值函数返回 None 表示本运算不适用，继续尝试后面的运算符
+TAC_BINARY_OPS = (
+    ('+', lambda e: e.count('+') == 1, lambda a, b: a + b),
+    ('-', lambda e: e.count('-') == 1, lambda a, b: a - b),
+    ('*', lambda e: e.count('*') == 1, lambda a, b: a * b),
+    ('/', lambda e: e.count('/') == 1, lambda a, b: a / b if b != 0 else None),
+    ('<=', lambda e: '<=' in e, lambda a, b: 1 if a <= b else 0),
+    ('>=', lambda e: '>=' in e, lambda a, b: 1 if a >= b else 0),
+    ('<', lambda e: '<' in e and '<=' not in e, lambda a, b: 1 if a < b else 0),
+    ('>', lambda e: '>' in e and '>=' not in e, lambda a, b: 1 if a > b else 0),
+    ('==', lambda e: '==' in e, lambda a, b: 1 if a == b else 0),
+    ('!=', lambda e: ' !=' in e, lambda a, b: 1 if a != b else 0),
+)
+
+# 由数字、小数点和减号组成的数字常量（其中格式不合法的在编译时求值为 None）
+TAC_NUMBER_RE = re.compile(r'[\d.-]*\d[\d.-]*')
+
+# 表达式中可能出现的运算符字符，一次扫描即可判断是否需要逐个匹配运算符
+TAC_OPERATOR_RE = re.compile(r'[-+*/<>=!]')
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_tac_expression(expr):
+    """把简单算术表达式编译成求值函数 evaluate(var_values)（结果按表达式缓存）"""
+    expr = expr.strip()
+
+    # 处理类型转换和一元负号
+    for prefix, cast in (('(int)', int), ('(float)', float)):
+        if expr.startswith(prefix):
+            inner = compile_tac_expression(expr[len(prefix):])
+
+            def evaluate(var_values):
+                val = inner(var_values)
+                if val is None:
+                    return None
+                # int(inf)/int(nan) 无法转换
+                try:
+                    return cast(val)
+                except (OverflowError, ValueError):
+                    return None
+            return evaluate
+
+    if expr.startswith('-'):
+        inner = compile_tac_expression(expr[1:])
+
+        def evaluate(var_values):
+            val = inner(var_values)
+            return -val if val is not None else None
+        return evaluate
+
+    if TAC_NUMBER_RE.fullmatch(expr):
+        # 数字常量在编译时直接求值
+        try:
+            constant = float(expr) if '.' in expr else int(expr)
+        except ValueError:
+            constant = None
+
+        def fallback(var_values):
+            return constant
+    else:
+        # 只保留能把表达式拆成左右两部分的运算符
+        candidates = []
+        ops = TAC_BINARY_OPS if TAC_OPERATOR_RE.search(expr) else ()
+        for op, applies, apply in ops:
+            if op in expr and applies(expr):
+                parts = expr.split(op)
+                if len(parts) == 2:
+                    candidates.append((apply,
+                                       compile_tac_expression(parts[0]),
+                                       compile_tac_expression(parts[1])))
+
+        def fallback(var_values):
+            for apply, left, right in candidates:
+                left_val = left(var_values)
+                right_val = right(var_values)
+                if left_val is not None and right_val is not None:
+                    # 超大整数转换为浮点数时会溢出
+                    try:
+                        result = apply(left_val, right_val)
+                    except OverflowError:
+                        return None
+                    if result is not None:
+                        return result
+            return None
 
-        self.rect = self.create_rectangle(0, 0, width, height, fill=color, outline="")
-        self.text_id = self.create_text(width//2, height//2, text=text, fill="white",
-                                        font=("Microsoft YaHei UI", 10, "bold"))
+    # 变量名优先于常量和运算
+    def evaluate(var_values):
+        if expr in var_values:
+            return var_values[expr]
+        return fallback(var_values)
+    return evaluate
+
+
+# 中间代码分析结果: 变量值表、计算步骤、返回值
+TacAnalysis = collections.namedtuple('TacAnalysis', 'variable_values process_steps return_value')
+
+
+@functools.lru_cache(maxsize=8)
+def analyze_tac_output(output):
+    """一次扫描中间代码，计算变量值、计算过程和返回值（结果按输出缓存）"""
+    variable_values = {}
+    process_steps = []
+    return_expr = None
+
+    for line in output.splitlines():
+        if 'return' in line:
+            # 记录第一条return语句，等变量值全部算完后再求值
+            if return_expr is None and not line.startswith('function'):
+                return_expr = line.partition('return')[2].partition('return')[0].strip()
+            continue
+
+        # 查找变量赋值
+        if '=' in line and 'function' not in line:
+            var, _, val_expr = line.partition('=')
+            if '=' not in val_expr:
+                var = var.strip()
+                val_expr = val_expr.strip()
+
+                # 计算变量的值
+                computed_val = compile_tac_expression(val_expr)(variable_values)
+                if computed_val is not None:
+                    variable_values[var] = computed_val
+                    # 添加到步骤列表
+                    if 't' not in var:  # 跳过临时变量
+                        process_steps.append(f"{var} = {computed_val}")
+
+    # 查找return语句的值
+    return_value = None
+    if return_expr is not None:
+        # 如果是纯数字，直接返回
+        if return_expr.isdecimal():
+            return_value = int(return_expr)
+        # 如果是变量名，从变量表中查找
+        elif return_expr in variable_values:
+            return_value = variable_values[return_expr]
+        # 尝试简单计算
+        else:
+            return_value = compile_tac_expression(return_expr)(variable_values)
+
+    return TacAnalysis(variable_values, tuple(process_steps), return_value)
+
+
+# 模拟执行的计算步骤: 前若干步、最后若干步（不含前面的）、总步数，每步为 (变量, 值)
+CalcSteps = collections.namedtuple('CalcSteps', 'head tail count')
+
+# 解码后的指令类型
+#   IR_NOP                                    不产生效果（标签定义、无法识别的行）
+#   IR_JUMP   (目标下标)                       无条件跳转
+#   IR_IF     (条件求值函数, 比较符, 目标下标)   条件跳转
+#   IR_RECORD (变量, 表达式, 是否数组操作)       只记录赋值表达式，不计算
+#   IR_ASSIGN (变量, 表达式, 求值函数, 是否记录步骤)
+#   IR_CONST  (变量, 表达式, 常量值, 是否记录步骤)   赋值为数字常量
+#   IR_RETURN (表达式)
+IR_NOP, IR_JUMP, IR_IF, IR_RECORD, IR_ASSIGN, IR_CONST, IR_RETURN = range(7)
+
+
+@functools.lru_cache(maxsize=8)
+def decode_ir_program(ir_lines):
+    """扫描中间代码行（元组），识别数组变量并解码为指令元组（结果按代码缓存）"""
+    # 首先扫描代码，识别哪些变量是数组
+    # 检测方法：
+    # 1. 检测 LOAD/STORE 指令中的数组访问
+    # 2. 检测孤立的 = * 赋值（不完整的数组操作）
+    array_variables = set()
+    has_incomplete_array_ops = False
+
+    for line in ir_lines:
+        line_stripped = line.strip()
+        # 检测完整的 LOAD 指令: t0 = *array
+        if '= *' in line_stripped and len(line_stripped.split('= *')) >= 2:
+            parts = line_stripped.split('= *')
+            if len(parts) == 2:
+                array_var = parts[1].strip()
+                if array_var and not array_var.startswith('t'):
+                    array_variables.add(array_var)
+
+        # 检测不完整的数组操作（只有 = *）
+        # 这表明存在数组操作，但无法识别具体变量
+        if line_stripped.endswith('= *') or line_stripped == '*':
+            has_incomplete_array_ops = True
+
+    # 建立标签到指令索引的映射
+    label_to_index = {}
+    instructions = []
+
+    for line in ir_lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        # 检查是否是标签（过滤掉标签行，不添加到指令列表）
+        # 只处理L开头的标签，排除function开头的行
+        if line.endswith(':') and line.startswith('L'):
+            label = line.rstrip(':')
+            label_to_index[label] = len(instructions)
+            continue
+
+        # 跳过空行、标签行和函数声明行，只添加实际指令
+        # 排除 function、main: 等声明性语句
+        if not line.startswith('function') and not line.endswith('main:') and not line == 'main:':
+            instructions.append(decode_ir_instruction(line, array_variables,
+                                                      has_incomplete_array_ops))
+
+    # 没有给形如数字的变量名赋值时，数字常量的值与变量表无关，可在解码时算出
+    fold_constants = not any(inst[0] == IR_ASSIGN and TAC_NUMBER_RE.fullmatch(inst[1])
+                             for inst in instructions)
+
+    # 标签全部确定后把跳转目标换成指令下标，找不到的标签视为跳到下一条
+    for i, inst in enumerate(instructions):
+        if inst[0] == IR_JUMP:
+            instructions[i] = (IR_JUMP, label_to_index.get(inst[1], i + 1))
+        elif inst[0] == IR_IF:
+            instructions[i] = inst[:3] + (label_to_index.get(inst[3], i + 1),)
+        elif inst[0] == IR_ASSIGN and fold_constants and TAC_NUMBER_RE.fullmatch(inst[2]):
+            _, var, expr, evaluate, record_step = inst
+            val = evaluate({})
+            if val is None:
+                instructions[i] = (IR_RECORD, var, expr, False)
+            else:
+                instructions[i] = (IR_CONST, var, expr, val, record_step)
+
+    return tuple(instructions)
+
+
+def decode_ir_instruction(line, array_variables, has_incomplete_array_ops):
+    """把一行指令解码为 (类型, 操作数...)，执行时不必再逐次比较字符串"""
+    # 标签定义行（非L开头的标签）
+    if line.endswith(':'):
+        return (IR_NOP,)
+
+    # 跳转指令: jump label
+    if line.startswith('jump '):
+        return (IR_JUMP, line[5:].strip())
+
+    if line.startswith('if '):
+        # 格式: if cond != 0 goto label 或 if cond == 0 goto label
+        parts = line.split()
+        if len(parts) < 6:
+            return (IR_NOP,)
+        target = parts[5] if parts[4] == 'goto' else parts[4]
+        return (IR_IF, compile_tac_expression(parts[1]), parts[2], target)
+
+    # 赋值指令
+    if '=' in line and 'return' not in line:
+        var, _, expr = line.partition('=')
+        var = var.strip()
+        expr = expr.strip()
+
+        # call指令只记录表达式，不尝试计算
+        if 'call' in expr:
+            return (IR_RECORD, var, expr, False)
+
+        # 数组操作（LOAD/STORE指令）
+        if '*' in expr:
+            return (IR_RECORD, var, expr, True)
+
+        # 跳过数组变量声明
+        # 1. 如果变量已被识别为数组，且赋值是数字
+        # 2. 如果存在不完整的数组操作，且赋值是小于100的数字（可能是数组大小）
+        is_array_decl = (var in array_variables and expr.isdigit())
+        is_probable_array_decl = (has_incomplete_array_ops and expr.isdecimal() and
+                                  not var.startswith('t') and int(expr) < 100)
+        if is_array_decl or is_probable_array_decl or not (var and expr):
+            return (IR_RECORD, var, expr, False)
+
+        # 正常的变量赋值，L开头的变量不记录在计算步骤中
+        return (IR_ASSIGN, var, expr, compile_tac_expression(expr), not var.startswith('L'))
+
+    # return指令: 取第一个与第二个 return 之间的表达式
+    if line.startswith('return'):
+        return (IR_RETURN, line.split('return')[1].strip())
+
+    return (IR_NOP,)
+
+
+@functools.lru_cache(maxsize=32)
+def simulate_ir_program(ir_lines):
+    """模拟中间代码行（元组）的执行，返回 (计算步骤, 返回值)（结果按代码缓存）"""
+    # 指令解码（含数组变量识别和跳转目标）只取决于代码本身，相同代码只解码一次
+    instructions = decode_ir_program(ir_lines)
+
+    # 模拟执行
+    var_values = {}
+    assignment_expressions = {}  # 追踪赋值表达式: var -> expr
+    # 计算步骤只保留前后各 CALC_STEPS_PREVIEW 步用于显示，另外记录总步数
+    head_steps = []
+    tail_steps = collections.deque(maxlen=CALC_STEPS_PREVIEW)
+    step_count = 0
+    return_val = None
+    pc = 0
+    max_iterations = 1000  # 防止无限循环
+    has_array_operations = False  # 标记是否包含数组操作
+    instruction_count = len(instructions)
+
+    # 迭代次数由 range 计数，循环体内只需比较 pc
+    for _ in range(max_iterations):
+        if pc >= instruction_count:
+            break
+        inst = instructions[pc]
+        kind = inst[0]
+
+        # 正常的变量赋值
+        if kind == IR_ASSIGN:
+            _, var, expr, evaluate, record_step = inst
+            assignment_expressions[var] = expr
+            val = evaluate(var_values)
+            if val is not None:
+                var_values[var] = val
+                # 记录所有赋值（包括临时变量）用于调试
+                if record_step:
+                    step_count += 1
+                    if step_count <= CALC_STEPS_PREVIEW:
+                        head_steps.append((var, val))
+                    else:
+                        tail_steps.append((var, val))
+            pc += 1
+            continue
+
+        # 常量赋值，值在解码时已算好
+        if kind == IR_CONST:
+            _, var, expr, val, record_step = inst
+            assignment_expressions[var] = expr
+            var_values[var] = val
+            if record_step:
+                step_count += 1
+                if step_count <= CALC_STEPS_PREVIEW:
+                    head_steps.append((var, val))
+                else:
+                    tail_steps.append((var, val))
+            pc += 1
+            continue
+
+        # 记录赋值表达式（即使无法计算）
+        if kind == IR_RECORD:
+            _, var, expr, is_array_op = inst
+            assignment_expressions[var] = expr
+            if is_array_op:
+                has_array_operations = True
+            pc += 1
+            continue
 
-        self.bind("<Enter>", self.on_enter)
-        self.bind("<Leave>", self.on_leave)
-        self.bind("<Button-1>", self.on_click)
+        # 处理跳转指令
+        if kind == IR_JUMP:
+            pc = inst[1]
+            continue
 
-    def on_enter(self, event):
-        self.config(cursor="hand2")
-        self.itemconfig(self.rect, fill=self.hover_color)
+        if kind == IR_IF:
+            _, evaluate, op, target_index = inst
 
-    def on_leave(self, event):
-        self.config(cursor="")
-        self.itemconfig(self.rect, fill=self.original_color)
+            # 计算条件值
+            cond_val = evaluate(var_values)
+            if cond_val is None:
+                cond_val = 0
 
-    def on_click(self, event):
-        if self.command:
-            self.command()
+            if op == '!=' and cond_val != 0:
+                pc = target_index
+            elif op == '==' and cond_val == 0:
+                pc = target_index
+            else:
+                pc += 1
+            continue
+
+        # 处理return指令
+        if kind == IR_RETURN:
+            expr = inst[1]
+            return_val = compile_tac_expression(expr)(var_values)
+            # 如果有数组操作但返回值无法计算，尝试显示已知信息
+            if has_array_operations and return_val is None:
+                # 尝试从临时变量中找出可能的返回值
+                if expr in var_values:
+                    return_val = var_values[expr]
+                # 尝试从赋值表达式中查找
+                elif expr in assignment_expressions:
+                    # 获取变量的赋值表达式（如 t10 = t6 + t8）
+                    assign_expr = assignment_expressions[expr]
+                    # 尝试计算这个表达式
+                    return_val = compile_tac_expression(assign_expr)(var_values)
+                    # 如果还是无法计算，尝试推断模式
+                    if return_val is None and '+' in assign_expr:
+                        # 检查是否有多个赋值过的临时变量
+                        temp_vars = [k for k in var_values.keys() if k.startswith('t')]
+                        if len(temp_vars) >= 3:
+                            # 按顺序排序临时变量
+                            sorted_vars = sorted(temp_vars, key=lambda x: int(x[1:]) if x[1:].isdigit() else 0)
+                            # 使用第一个和第三个（跳过中间的）来模拟数组访问
+                            # t0=1, t2=2, t4=6 -> 使用t0和t4
+                            if len(sorted_vars) >= 3:
+                                left_val = var_values[sorted_vars[0]]
+                                right_val = var_values[sorted_vars[2]]
+                                return_val = left_val + right_val
+                # 如果是数组参数测试（如sum函数），尝试计算所有已赋值临时变量的和
+                if return_val is None:
+                    temp_vars = [k for k in var_values.keys() if k.startswith('t')]
+                    if temp_vars:
+                        # 检查是否有函数调用（通过是否有call指令判断）
+                        has_call = any('call' in assignment_expressions.get(k, '') for k in assignment_expressions)
+                        if has_call:
+                            # 对所有已赋值的临时变量求和（模拟sum函数）
+                            total_sum = sum(var_values[v] for v in temp_vars)
+                            return_val = total_sum
+            if has_array_operations and return_val is None:
+                return_val = "ARRAY_OPERATION"
+            break
+
+        pc += 1
+
+    return CalcSteps(tuple(head_steps), tuple(tail_steps), step_count), return_val
 
 
 class StageCard(tk.Frame):
     """编译阶段卡片 - 自适应版本"""
+    # 各状态的 (背景色, 图标颜色)，未列出的状态按 pending 显示
+    STATUS_COLORS = {
+        "pending": ("#353535", "#444"),
+        "running": ("#3a3a3a", "#007acc"),
+        "completed": ("#1a3a1a", "#107c10"),
+        "error": ("#3a1a1a", "#d13438"),
+    }
+    # 背景色渐变的帧数和每帧间隔(毫秒)
+    FADE_STEPS = 4
+    FADE_MS = 16
+
     def __init__(self, parent, title, icon, color):
         super().__init__(parent, bg="#2b2b2b", highlightthickness=0,
                        padx=5, pady=5)
         self.color = color
         self.status = "pending"  # pending, running, completed, error
         self.title_text = title
+        self._bg = "#353535"
+        self._fade_job = None
 
         # 主容器
         self.main_frame = tk.Frame(self, bg="#353535", relief=tk.FLAT)
@@ -68,28 +563,172 @@ class StageCard(tk.Frame):
                                    fg="#888", font=("Microsoft YaHei UI", 8))
         self.title_label.pack(pady=(0, 5))
 
-        # 绑定大小变化事件
-        self.bind("<Configure>", self._on_resize)
-
-    def _on_resize(self, event):
-        """窗口大小变化时重绘"""
-        pass
-
     def set_status(self, status):
-        """设置状态"""
+        """设置状态（背景色由 after 分几帧渐变，不阻塞调用方）"""
+        # 状态未变时颜色已是（或正渐变到）目标值，不必重新配置
+        if status == self.status:
+            return
         self.status = status
-        if status == "running":
-            self.main_frame.config(bg="#3a3a3a")
-            self.icon_label.config(bg="#3a3a3a", fg="#007acc")
-        elif status == "completed":
-            self.main_frame.config(bg="#1a3a1a")
-            self.icon_label.config(bg="#1a3a1a", fg="#107c10")
-        elif status == "error":
-            self.main_frame.config(bg="#3a1a1a")
-            self.icon_label.config(bg="#3a1a1a", fg="#d13438")
+        bg, fg = self.STATUS_COLORS.get(status, self.STATUS_COLORS["pending"])
+        self.icon_label.config(fg=fg)
+        if self._fade_job is not None:
+            self.after_cancel(self._fade_job)
+            self._fade_job = None
+        self._fade_step(self._bg, bg, 1)
+
+    def _fade_step(self, start, end, step):
+        """把背景色从 start 向 end 推进一帧"""
+        ratio = step / self.FADE_STEPS
+        color = "#" + "".join(
+            f"{round(int(start[i:i + 2], 16) * (1 - ratio) + int(end[i:i + 2], 16) * ratio):02x}"
+            for i in (1, 3, 5))
+        self.main_frame.config(bg=color)
+        self.icon_label.config(bg=color)
+        self._bg = color
+        if step < self.FADE_STEPS:
+            self._fade_job = self.after(self.FADE_MS, self._fade_step, start, end, step + 1)
+        else:
+            self._fade_job = None
+
+
+class VirtualText(scrolledtext.ScrolledText):
+    """只读输出框 - 内容较多时只渲染可见区域附近的行"""
+    def __init__(self, parent, window=400, threshold=2000, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.lines = []          # 全部内容，每项为 str 或 ((文本, 标签), ...)
+        self.first = 0           # 已渲染的第一行在 lines 中的下标
+        self.window = window     # 虚拟化时渲染的行数
+        self.threshold = threshold
+        self._rendering = False
+        self._render_job = None
+
+        # 接管滚动条，让它反映完整内容而不是已渲染的片段
+        self.vbar.config(command=self._on_scrollbar)
+        self.config(yscrollcommand=self._on_yview)
+
+    def is_virtual(self):
+        return len(self.lines) > self.threshold
+
+    def set_lines(self, lines):
+        """替换全部内容"""
+        self.lines = list(lines)
+        self._render(0, 0)
+
+    def clear(self):
+        """清空内容"""
+        self.lines = []
+        self.first = 0
+        self.delete(1.0, tk.END)
+
+    def _render(self, first, top):
+        """渲染 lines[first:first+window]，并将第 top 行滚动到顶部"""
+        self._render_job = None
+        total = len(self.lines)
+        if self.is_virtual():
+            first = max(0, min(first, total - self.window))
+            end = first + self.window
+        else:
+            first, end = 0, total
+        self.first = first
+
+        # 连续的纯文本行合并，整个片段一次 insert
+        args = []
+        plain = []
+        for line in self.lines[first:end]:
+            if isinstance(line, str):
+                plain.append(line)
+                continue
+            if plain:
+                args += ('\n'.join(plain) + '\n', ())
+                plain = []
+            for segment in line:
+                args += segment
+            args += ('\n', ())
+        if plain:
+            args += ('\n'.join(plain) + '\n', ())
+
+        self._rendering = True
+        try:
+            self.delete(1.0, tk.END)
+            if args:
+                self.insert(tk.END, *args)
+            self.yview(f"{max(top - first, 0) + 1}.0")
+        finally:
+            self._rendering = False
+
+    def _on_yview(self, lo, hi):
+        """视图变化：换算滚动条位置，接近已渲染区域边缘时重新渲染"""
+        lo, hi = float(lo), float(hi)
+        total = len(self.lines)
+        if not self.is_virtual():
+            self.vbar.set(lo, hi)
+            return
+
+        shown = min(self.window, total - self.first)
+        self.vbar.set((self.first + lo * shown) / total, (self.first + hi * shown) / total)
+        if self._rendering or self._render_job is not None:
+            return
+
+        near_top = lo < 0.1 and self.first > 0
+        near_bottom = hi > 0.9 and self.first + shown < total
+        if near_top or near_bottom:
+            top = self.first + int(self.index('@0,0').split('.')[0]) - 1
+            self._render_job = self.after_idle(self._render, top - self.window // 2, top)
+
+    def _on_scrollbar(self, *args):
+        """拖动滚动条：目标超出已渲染区域时，以目标行为中心重新渲染"""
+        if not self.is_virtual() or args[0] != 'moveto':
+            self.yview(*args)
+            return
+
+        top = min(int(float(args[1]) * len(self.lines)), len(self.lines) - 1)
+        margin = self.window // 4
+        if self.first + margin <= top < self.first + self.window - margin:
+            self.yview(f"{top - self.first + 1}.0")
+        else:
+            self._render(top - self.window // 2, top)
+
+
+class LazyPane:
+    """延迟创建的标签页内容 - 首次显示时才创建输出框；未显示时的输出先记录下来，切换到该页时再填充"""
+    # 普通 Python 对象（不是 Tk 控件），属性固定，不需要实例 __dict__
+    __slots__ = ('frame', 'factory', 'widget', 'pending', 'visible', 'placeholder')
+
+    def __init__(self, frame, factory):
+        self.frame = frame
+        self.factory = factory
+        self.widget = None
+        self.pending = None      # (函数, 参数)，切换到该页时执行
+        self.visible = False     # 所在标签页是否为当前选中页
+
+        self.placeholder = tk.Label(frame, text="(暂无内容)", bg="#0c0c0c", fg="#555",
+                                    font=("Microsoft YaHei UI", 9))
+        self.placeholder.pack(fill=tk.BOTH, expand=True)
+
+    def show(self):
+        """切换到该标签页：创建输出框并补上之前记录的输出"""
+        self.visible = True
+        if self.widget is None:
+            self.placeholder.destroy()
+            self.widget = self.factory(self.frame)
+        if self.pending is not None:
+            func, args = self.pending
+            self.pending = None
+            func(*args)
+        return self.widget
+
+    def run(self, func, *args):
+        """标签页正在显示则立即执行，否则等切换到该页时再执行（只保留最新一次）"""
+        if self.widget is None or not self.visible:
+            self.pending = (func, args)
         else:
-            self.main_frame.config(bg="#353535")
-            self.icon_label.config(bg="#353535", fg="#444")
+            func(*args)
+
+    def clear(self):
+        """清空内容"""
+        self.pending = None
+        if self.widget is not None:
+            self.widget.clear()
 
 
 class SysCompilerGUI:
@@ -100,23 +739,16 @@ class SysCompilerGUI:
         self.root.configure(bg="#1e1e1e")
 
         # 确保工作目录正确（切换到脚本所在目录）
-        import os
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        os.chdir(script_dir)
+        os.chdir(SCRIPT_DIR)
 
         # 绑定窗口大小变化事件
+        self._resize_job = None
         self.root.bind('<Configure>', self.on_window_resize)
 
-        # 编译器路径 - 自动检测平台
-        import platform
-        import sys
-        if platform.system() == 'Windows':
-            # Windows使用相对路径，不带./
-            self.compiler_path = "build/sysc.exe"
-        else:
-            self.compiler_path = "build/sysc"
+        # 编译器路径（平台在模块加载时已检测）
+        self.compiler_path = COMPILER_PATH
 
-        # 检查编译器是否存在
+        # 检查编译器是否存在，之后只在运行失败时更新
         self.compiler_available = os.path.exists(self.compiler_path)
 
         # 当前文件和代码
@@ -124,6 +756,19 @@ class SysCompilerGUI:
         self.is_compiling = False
         self.last_ir_output = ""
 
+        # 推迟格式化的大输出: 阶段名 -> (原始输出, 展开链接的 Tcl 回调名)
+        self._deferred = {}
+
+        # 编译结果缓存: (源码摘要, 编译器mtime) -> [(输出, 是否成功), ...]
+        self._compile_cache = collections.OrderedDict()
+
+        # 行号重绘的防抖任务id，以及上次绘制时的可见范围 (首行, 末行, 首行y坐标)
+        self._ln_job = None
+        self._ln_view = None
+
+        # 编辑器全文缓存，内容修改后置为 None，下次读取时再取回
+        self._source_text = None
+
         # 编译阶段状态
         self.stages = {}
 
@@ -141,7 +786,45 @@ class SysCompilerGUI:
             "📭 测试3-10: 空表达式": "examples/test_3_10_empty_expr.sy",
         }
 
+        # 启动时扫描一次示例目录，记录存在的示例；内容由后台线程预先读入内存
+        self._example_exists = self.scan_examples()
+        self._example_cache = {}
+        threading.Thread(target=self.preload_examples, daemon=True,
+                         name="preload-examples").start()
+
+        # 编译在单线程的执行器中运行；取消时杀掉登记的编译器进程
+        self._compile_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="compile")
+        self._cancel_event = threading.Event()
+        self._active_procs = set()
+
+        # 后台编译线程与主线程之间的界面更新队列: (操作, *参数)
+        # 只需 put/get_nowait，SimpleQueue 没有 Queue 的任务计数和条件变量开销
+        self._ui_queue = queue.SimpleQueue()
+        # 队列只在编译期间轮询，空闲时不再定时唤醒主线程
+        self._ui_job = None
+        self._ui_handlers = {
+            "status": StageCard.set_status,
+            "distribute": self.distribute_output,
+            "cache": self.store_compile_result,
+            "finish": self.finish_compilation,
+        }
+
         self.setup_ui()
+
+        # 各阶段输出的处理方法: 阶段名 -> (编译输出格式化, 专用标签页填充)
+        # 专用标签页的填充经 LazyPane.run 推迟到标签页首次显示
+        self._stage_dispatch = {
+            "词法分析": (self.format_lexical_output,
+                        functools.partial(self.token_pane.run, self.display_tokens)),
+            "语法分析": (self.format_syntax_output,
+                        functools.partial(self.ast_pane.run, self.extract_ast)),
+            "语义分析": (self.format_semantic_output, None),
+            "中间代码": (self.format_ir_output, self.store_ir_output),
+            "代码优化": (self.format_optimize_output, None),
+            "目标代码": (self.format_asm_output,
+                        functools.partial(self.asm_pane.run, self.extract_assembly)),
+        }
         self.load_example("📝 测试3-1: 基础语法")
 
         # 显示编译器状态
@@ -210,6 +893,7 @@ class SysCompilerGUI:
         self.create_tool_button(btn_frame, "📂", "打开文件", "#0078d7", self.open_file)
         self.create_tool_button(btn_frame, "💾", "保存", "#3a3a3a", self.save_file)
         self.create_tool_button(btn_frame, "▶️", "编译", "#107c10", self.compile_all)
+        self.create_tool_button(btn_frame, "⏹", "停止编译", "#d83b01", self.cancel_compilation)
         self.create_tool_button(btn_frame, "🧹", "清空", "#d13438", self.clear_all)
 
     def create_tool_button(self, parent, icon, tooltip, color, command):
@@ -236,7 +920,8 @@ class SysCompilerGUI:
         # 示例文件下拉框
         self.example_var = tk.StringVar(value="选择示例文件...")
         example_combo = ttk.Combobox(example_bar, textvariable=self.example_var,
-                                     values=list(self.examples.keys()),
+                                     values=[name for name, path in self.examples.items()
+                                             if path in self._example_exists],
                                      state="readonly", width=25,
                                      font=("Microsoft YaHei UI", 9))
         example_combo.pack(side=tk.RIGHT, padx=15, pady=8)
@@ -275,14 +960,17 @@ class SysCompilerGUI:
         )
         self.code_editor.pack(fill=tk.BOTH, expand=True)
 
-        # 行号
-        self.line_numbers = tk.Text(editor_frame, width=4, padx=5, pady=10,
-                                     font=("Consolas", 12), state='disabled',
-                                     bg="#1e1e1e", fg="#555", borderwidth=0,
-                                     highlightthickness=0)
+        # 行号 - 画布上只绘制可见行
+        self.line_numbers = tk.Canvas(editor_frame, width=40, bg="#1e1e1e",
+                                      highlightthickness=0)
         self.line_numbers.pack(side=tk.LEFT, fill=tk.Y)
         self.code_editor.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
 
+        # 滚动、尺寸变化和内容修改后重绘行号（<<Modified>> 也覆盖粘贴、拖放等非键盘编辑）
+        self.code_editor.config(yscrollcommand=self.on_editor_scroll)
+        self.code_editor.bind("<Configure>", self.schedule_line_numbers)
+        self.code_editor.bind("<<Modified>>", self.on_editor_modified)
+
     def create_right_panel(self, parent):
         """创建右侧面板"""
         # 编译流程标题
@@ -358,12 +1046,41 @@ class SysCompilerGUI:
         )
         self.compile_output.pack(fill=tk.BOTH, expand=True)
 
-        # Token输出
+        # 预先注册颜色标签，避免每次输出时重复配置
+        for color in OUTPUT_COLORS:
+            self.compile_output.tag_config(color, foreground=color)
+        self._known_tags = set(OUTPUT_COLORS)
+
+        # Token、AST、汇编标签页在首次切换到时才创建输出框
         token_frame = tk.Frame(self.notebook, bg="#1e1e1e")
         self.notebook.add(token_frame, text="  Token  ")
+        self.token_pane = LazyPane(token_frame, self.create_token_output)
+
+        ast_frame = tk.Frame(self.notebook, bg="#1e1e1e")
+        self.notebook.add(ast_frame, text="  AST  ")
+        self.ast_pane = LazyPane(ast_frame, self.create_ast_output)
 
-        self.token_output = scrolledtext.ScrolledText(
-            token_frame, wrap=tk.NONE, font=("Consolas", 10),
+        asm_frame = tk.Frame(self.notebook, bg="#1e1e1e")
+        self.notebook.add(asm_frame, text="  汇编代码  ")
+        self.asm_pane = LazyPane(asm_frame, self.create_asm_output)
+
+        self._lazy_panes = {str(pane.frame): pane
+                            for pane in (self.token_pane, self.ast_pane, self.asm_pane)}
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+
+    def on_tab_changed(self, event):
+        """切换标签页时只填充当前显示的标签页，其余页的输出留到切换过去时再处理"""
+        selected = self.notebook.select()
+        for frame, pane in self._lazy_panes.items():
+            if frame == selected:
+                pane.show()
+            else:
+                pane.visible = False
+
+    def create_token_output(self, parent):
+        """创建Token输出框"""
+        self.token_output = VirtualText(
+            parent, wrap=tk.NONE, font=("Consolas", 10),
             bg="#0c0c0c", fg="#d4d4d4", borderwidth=0,
             highlightthickness=0, padx=10, pady=10
         )
@@ -374,28 +1091,27 @@ class SysCompilerGUI:
         self.token_output.tag_config("value", foreground="#ffffff")
         self.token_output.tag_config("line", foreground="#858585")
         self.token_output.tag_config("header", foreground="#007acc", font=("Consolas", 10, "bold"))
+        return self.token_output
 
-        # AST输出
-        ast_frame = tk.Frame(self.notebook, bg="#1e1e1e")
-        self.notebook.add(ast_frame, text="  AST  ")
-
-        self.ast_output = scrolledtext.ScrolledText(
-            ast_frame, wrap=tk.WORD, font=("Consolas", 9),
+    def create_ast_output(self, parent):
+        """创建AST输出框"""
+        self.ast_output = VirtualText(
+            parent, wrap=tk.WORD, font=("Consolas", 9),
             bg="#0c0c0c", fg="#d4d4d4", borderwidth=0,
             highlightthickness=0, padx=10, pady=10
         )
         self.ast_output.pack(fill=tk.BOTH, expand=True)
+        return self.ast_output
 
-        # 汇编输出
-        asm_frame = tk.Frame(self.notebook, bg="#1e1e1e")
-        self.notebook.add(asm_frame, text="  汇编代码  ")
-
-        self.asm_output = scrolledtext.ScrolledText(
-            asm_frame, wrap=tk.WORD, font=("Consolas", 10),
+    def create_asm_output(self, parent):
+        """创建汇编输出框"""
+        self.asm_output = VirtualText(
+            parent, wrap=tk.WORD, font=("Consolas", 10),
             bg="#0c0c0c", fg="#d4d4d4", borderwidth=0,
             highlightthickness=0, padx=10, pady=10
         )
         self.asm_output.pack(fill=tk.BOTH, expand=True)
+        return self.asm_output
 
     def on_example_selected(self):
         """示例文件选择事件"""
@@ -403,34 +1119,113 @@ class SysCompilerGUI:
         if selected in self.examples:
             self.load_example(selected)
 
+    def scan_examples(self):
+        """一次遍历示例目录，返回存在的示例文件路径集合"""
+        try:
+            with os.scandir("examples") as entries:
+                names = {entry.name for entry in entries if entry.is_file()}
+        except OSError:
+            return set()
+        return {path for path in self.examples.values()
+                if os.path.basename(path) in names}
+
+    def read_example(self, filepath):
+        """读取示例文件并记入缓存，返回内容"""
+        mtime = os.stat(filepath).st_mtime_ns
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+        self._example_cache[filepath] = (mtime, content)
+        return content
+
+    def preload_examples(self):
+        """后台读取所有示例文件到缓存（已缓存的不覆盖，读取失败的留给 load_example 报错）"""
+        for filepath in self._example_exists:
+            if filepath in self._example_cache:
+                continue
+            try:
+                self.read_example(filepath)
+            except Exception:
+                continue
+
     def load_example(self, name):
         """加载示例文件"""
         if name in self.examples:
             filepath = self.examples[name]
-            if os.path.exists(filepath):
+            if filepath in self._example_exists:
                 try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    self.code_editor.delete(1.0, tk.END)
-                    self.code_editor.insert(1.0, content)
-                    self.current_file = filepath
-                    self.file_label.config(text=os.path.basename(filepath))
-                    self.update_line_numbers()
+                    # 只 stat 一次比较修改时间，磁盘上的文件没变就直接用缓存内容
+                    cached = self._example_cache.get(filepath)
+                    if cached is not None and cached[0] == os.stat(filepath).st_mtime_ns:
+                        content = cached[1]
+                    else:
+                        content = self.read_example(filepath)
+                    self.set_editor_content(content, filepath)
                 except Exception as e:
                     messagebox.showerror("错误", f"无法加载文件: {e}")
 
+    def set_editor_content(self, content, filepath):
+        """用给定内容替换编辑器文本，并记录当前文件"""
+        self.code_editor.delete(1.0, tk.END)
+        self.code_editor.insert(1.0, content)
+        self.current_file = filepath
+        self.file_label.config(text=os.path.basename(filepath))
+        self.update_line_numbers()
+
+    def schedule_line_numbers(self, event=None):
+        """延迟刷新行号，合并连续的编辑事件"""
+        if self._ln_job is not None:
+            self.root.after_cancel(self._ln_job)
+        self._ln_job = self.root.after(50, self.update_line_numbers)
+
+    def on_editor_modified(self, event=None):
+        """编辑器内容变化：清除修改标记以便下次再触发，并延迟刷新行号"""
+        self.code_editor.edit_modified(False)
+        self._source_text = None
+        self.schedule_line_numbers()
+
+    def editor_source(self):
+        """返回编辑器全文（内容未修改时复用上次取出的文本）"""
+        # 修改标记仍为真说明 <<Modified>> 尚未处理，缓存可能已过期
+        if self._source_text is None or self.code_editor.edit_modified():
+            self._source_text = self.code_editor.get(1.0, tk.END)
+        return self._source_text
+
+    def on_editor_scroll(self, first, last):
+        """编辑器视图变化：更新滚动条并重绘行号"""
+        self.code_editor.vbar.set(first, last)
+        self.update_line_numbers()
+
     def update_line_numbers(self):
-        """更新行号"""
-        content = self.code_editor.get(1.0, tk.END)
-        lines = content.count('\n')
-        line_nums = '\n'.join(str(i) for i in range(1, lines + 2))
-        self.line_numbers.config(state='normal')
-        self.line_numbers.delete(1.0, tk.END)
-        self.line_numbers.insert(1.0, line_nums)
-        self.line_numbers.config(state='disabled')
+        """重绘行号（只绘制当前可见的行）"""
+        if self._ln_job is not None:
+            self.root.after_cancel(self._ln_job)
+            self._ln_job = None
+
+        editor = self.code_editor
+        canvas = self.line_numbers
+        first = int(editor.index('@0,0').split('.')[0])
+        last = int(editor.index(f'@0,{editor.winfo_height()}').split('.')[0])
+
+        # 编辑器不自动换行，可见范围和首行位置不变时行号也不变，无需重绘
+        first_info = editor.dlineinfo(f"{first}.0")
+        view = (first, last, first_info[1] if first_info else None)
+        if view == self._ln_view:
+            return
+        self._ln_view = view
+
+        canvas.delete('ln')
+        width = int(canvas.cget('width'))
+        for line in range(first, last + 1):
+            info = editor.dlineinfo(f"{line}.0")
+            if info is None:
+                continue
+            canvas.create_text(width - 5, info[1], anchor='ne', text=str(line),
+                               fill="#555", font=("Consolas", 12), tags='ln')
 
     def open_file(self):
         """打开文件"""
+        # 文件对话框只在打开/保存时用到，首次使用时才导入
+        from tkinter import filedialog
         filename = filedialog.askopenfilename(
             title="选择Sys源文件",
             filetypes=[("Sys文件", "*.sy"), ("所有文件", "*.*")],
@@ -440,17 +1235,14 @@ class SysCompilerGUI:
             try:
                 with open(filename, 'r', encoding='utf-8') as f:
                     content = f.read()
-                self.code_editor.delete(1.0, tk.END)
-                self.code_editor.insert(1.0, content)
-                self.current_file = filename
-                self.file_label.config(text=os.path.basename(filename))
-                self.update_line_numbers()
+                self.set_editor_content(content, filename)
             except Exception as e:
                 messagebox.showerror("错误", f"无法打开文件: {e}")
 
     def save_file(self):
         """保存文件"""
         if not self.current_file:
+            from tkinter import filedialog
             filename = filedialog.asksaveasfilename(
                 title="保存Sys源文件",
                 filetypes=[("Sys文件", "*.sy"), ("所有文件", "*.*")],
@@ -461,8 +1253,12 @@ class SysCompilerGUI:
 
         if filename:
             try:
+                # 按文本片段逐段写入，不拼出整个文件内容的临时字符串
                 with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(self.code_editor.get(1.0, tk.END))
+                    f.writelines(chunk for _, chunk, _ in
+                                 self.code_editor.dump(1.0, tk.END, text=True))
+                # 保存的可能是示例文件，丢弃其缓存内容
+                self._example_cache.pop(filename, None)
                 self.current_file = filename
                 self.file_label.config(text=os.path.basename(filename))
                 messagebox.showinfo("成功", "文件保存成功")
@@ -473,11 +1269,13 @@ class SysCompilerGUI:
         """清空所有内容"""
         self.code_editor.delete(1.0, tk.END)
         self.compile_output.delete(1.0, tk.END)
-        self.token_output.delete(1.0, tk.END)
-        self.ast_output.delete(1.0, tk.END)
-        self.asm_output.delete(1.0, tk.END)
+        self.discard_deferred()
+        self.token_pane.clear()
+        self.ast_pane.clear()
+        self.asm_pane.clear()
         self.last_ir_output = ""
         self.file_label.config(text="untitled.sy")
+        self.update_line_numbers()
 
         # 重置所有阶段状态
         for stage in [self.stage_lexical, self.stage_syntax, self.stage_semantic,
@@ -486,16 +1284,81 @@ class SysCompilerGUI:
 
     def append_output(self, text, color="#4ec9b0"):
         """追加编译输出"""
-        self.compile_output.insert(tk.END, text, color)
+        self.append_segments([(text, color)])
+
+    def append_segments(self, segments):
+        """一次追加多段 (文本, 颜色) 编译输出"""
+        self.write_segments(segments)
+        self.trim_output()
         self.compile_output.see(tk.END)
-        self.compile_output.tag_config(color, foreground=color)
+
+    def write_segments(self, segments):
+        """插入多段 (文本, 颜色) 编译输出，不裁剪也不滚动"""
+        for _, color in segments:
+            if color not in self._known_tags:
+                self.compile_output.tag_config(color, foreground=color)
+                self._known_tags.add(color)
+        self.insert_segments(self.compile_output, segments)
+
+    def trim_output(self, max_lines=COMPILE_OUTPUT_MAX_LINES):
+        """编译输出超过 max_lines 行时删除最早的行"""
+        count = int(self.compile_output.index('end-1c').split('.')[0])
+        if count > max_lines:
+            self.compile_output.delete('1.0', f'{count - max_lines + 1}.0')
+
+    def post_ui(self, op, *args):
+        """工作线程提交界面更新事件，由主线程的 drain_ui_queue 执行"""
+        self._ui_queue.put((op, *args))
+
+    def drain_ui_queue(self):
+        """主线程定时处理界面更新事件，相邻的输出追加合并为一次 insert"""
+        self._ui_job = None
+        segments = []
+        handled = 0
+        try:
+            for _ in range(UI_EVENTS_PER_TICK):
+                try:
+                    op, *args = self._ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                handled += 1
+                if op == "append":
+                    segments.append(tuple(args))
+                    continue
+                if segments:
+                    self.write_segments(segments)
+                    segments = []
+                self._ui_handlers[op](*args)
+            if segments:
+                self.write_segments(segments)
+
+            # 整批事件处理完后只裁剪和滚动一次
+            if handled:
+                self.trim_output()
+                self.compile_output.see(tk.END)
+        finally:
+            # 编译结束（finish 是最后一个事件）且队列已取空后停止轮询
+            if self.is_compiling or handled == UI_EVENTS_PER_TICK:
+                self._ui_job = self.root.after(UI_TICK_MS, self.drain_ui_queue)
+
+    def insert_segments(self, widget, segments, index=tk.END):
+        """将多个 (文本, 标签) 片段合并为一次 insert 调用"""
+        if segments:
+            widget.insert(index, *itertools.chain.from_iterable(segments))
 
     def on_window_resize(self, event):
-        """窗口大小变化时的处理"""
+        """窗口大小变化时的处理（拖动过程中只保留最后一次）"""
         # 只处理主窗口的大小变化
-        if event.widget == self.root:
-            # 确保编辑器和输出区域能够自适应
-            pass
+        if event.widget is not self.root:
+            return
+        if self._resize_job is not None:
+            self.root.after_cancel(self._resize_job)
+        self._resize_job = self.root.after(100, self._do_resize)
+
+    def _do_resize(self):
+        """窗口大小稳定后的处理"""
+        self._resize_job = None
+        # 确保编辑器和输出区域能够自适应
 
     def run_compiler_stage(self, stage_name, args):
         """运行编译器单个阶段"""
@@ -503,17 +1366,44 @@ class SysCompilerGUI:
         if not self.compiler_available:
             return f"\n错误: 编译器不可用，请先运行 'make' 编译编译器\n", False
 
+        # subprocess 在启动时用不到，第一次编译时才导入
+        import subprocess
         try:
-            result = subprocess.run(
-                [self.compiler_path] + args,
-                capture_output=True,
+            # stderr合并到stdout，边运行边按行读取，避免整块缓冲后再拼接
+            cmd = [self.compiler_path] + args
+            proc = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=1,
                 text=True,
-                timeout=30,
                 encoding='utf-8',
                 errors='ignore'
             )
-            output = result.stdout + result.stderr
-            success = result.returncode == 0
+            timed_out = threading.Event()
+
+            def kill_on_timeout():
+                timed_out.set()
+                proc.kill()
+
+            # 超时后杀掉子进程，读取循环随之结束
+            timer = threading.Timer(30, kill_on_timeout)
+            timer.start()
+            self.register_proc(proc)
+            with proc:
+                try:
+                    chunks = [line for line in proc.stdout]
+                    proc.wait()
+                finally:
+                    timer.cancel()
+                    self._active_procs.discard(proc)
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(cmd, 30)
+            if self._cancel_event.is_set():
+                return f"\n{stage_name} 已取消\n", False
+
+            output = ''.join(chunks)
+            success = proc.returncode == 0
 
             # 如果输出为空，返回提示信息
             if not output.strip():
@@ -528,6 +1418,121 @@ class SysCompilerGUI:
         except Exception as e:
             return f"\n错误: {stage_name} - {str(e)}\n", False
 
+    def run_stages_concurrently(self, stages):
+        """各阶段只读取同一个源文件，互不依赖：同时启动全部进程，再按阶段顺序产出结果"""
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(stages)) as executor:
+            futures = [executor.submit(self.run_compiler_stage, stage_name, args)
+                       for stage_name, args, _ in stages]
+            for future in futures:
+                yield future.result()
+
+    def run_compiler_pipeline(self, stages, code, asm_file):
+        """只启动一次编译器（-stdin -pipeline），源码经管道传入，边读取边按阶段顺序产出 (输出, 是否成功)
+
+        编译器不支持 -stdin/-pipeline 时（输出中没有阶段标记）改为写入临时文件后分别运行各阶段。
+        """
+        import subprocess
+        done = 0
+        proc = None
+        if self.compiler_available:
+            try:
+                proc = subprocess.Popen(
+                    [self.compiler_path, "-stdin", "-pipeline", "-o", asm_file],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    bufsize=1,
+                    text=True,
+                    encoding='utf-8',
+                    errors='ignore'
+                )
+            except OSError:
+                proc = None
+
+        if proc is not None:
+            # 编译器先读完全部源码再输出，一次写入后关闭管道不会阻塞
+            try:
+                proc.stdin.write(code)
+                proc.stdin.close()
+            except OSError:
+                # 旧版编译器不读取标准输入就退出了
+                pass
+
+            timed_out = threading.Event()
+
+            def kill_on_timeout():
+                timed_out.set()
+                proc.kill()
+
+            # 超时后杀掉子进程，读取循环随之结束
+            timer = threading.Timer(30, kill_on_timeout)
+            timer.start()
+            self.register_proc(proc)
+            with proc:
+                try:
+                    chunks = None
+                    for line in proc.stdout:
+                        if chunks is None:
+                            if PIPELINE_BEGIN_RE.match(line):
+                                chunks = []
+                            continue
+                        end = PIPELINE_END_RE.match(line)
+                        if end is None:
+                            chunks.append(line)
+                            continue
+
+                        # 一个阶段结束，立即交给界面
+                        output = ''.join(chunks)
+                        chunks = None
+                        if not output.strip():
+                            output = f"(无输出)\n"
+                        done += 1
+                        yield output, end.group(2) == '0'
+                    proc.wait()
+                finally:
+                    timer.cancel()
+                    self._active_procs.discard(proc)
+
+            if self._cancel_event.is_set():
+                for stage_name, _, _ in stages[done:]:
+                    yield f"\n{stage_name} 已取消\n", False
+                return
+            if timed_out.is_set():
+                for stage_name, _, _ in stages[done:]:
+                    yield f"\n错误: {stage_name} 超时（超过30秒）\n", False
+                return
+            if done:
+                for stage_name, _, _ in stages[done:]:
+                    yield f"\n错误: {stage_name} - 编译器异常退出\n", False
+                return
+
+        # 旧版编译器或无法启动时按阶段分别运行（错误信息由 run_compiler_stage 给出）
+        if not self.compiler_available:
+            yield from self.run_stages_concurrently(stages)
+            return
+
+        # 分阶段运行只能读取源文件，此时才写出临时文件
+        import tempfile
+        temp_file = None
+        try:
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.sy',
+                                             prefix='temp_gui_compile_', dir='.',
+                                             delete=False) as f:
+                temp_file = f.name
+                f.write(code)
+        except OSError as e:
+            if temp_file:
+                pathlib.Path(temp_file).unlink(missing_ok=True)
+            for stage_name, _, _ in stages:
+                yield f"\n错误: 无法保存临时文件: {e}\n", False
+            return
+        try:
+            yield from self.run_stages_concurrently(
+                [(stage_name, args + [temp_file], stage_widget)
+                 for stage_name, args, stage_widget in stages])
+        finally:
+            pathlib.Path(temp_file).unlink(missing_ok=True)
+
     def compile_all(self):
         """执行完整编译"""
         # 检查编译器是否可用
@@ -535,7 +1540,10 @@ class SysCompilerGUI:
             messagebox.showerror("错误", "编译器不可用！\n\n请先在项目目录下运行 'make' 命令编译编译器。")
             return
 
-        code = self.code_editor.get(1.0, tk.END).strip()
+        # 编辑器为空时 'end-1c' 即 '1.0'，不必取出整个文本再判断
+        code = ""
+        if self.code_editor.index('end-1c') != '1.0':
+            code = self.editor_source().strip()
         if not code:
             messagebox.showwarning("警告", "请先输入或选择代码")
             return
@@ -545,174 +1553,281 @@ class SysCompilerGUI:
             return
 
         self.is_compiling = True
+        self._cancel_event.clear()
+        if self._ui_job is None:
+            self._ui_job = self.root.after(UI_TICK_MS, self.drain_ui_queue)
 
         # 清空输出
         self.compile_output.delete(1.0, tk.END)
-        self.token_output.delete(1.0, tk.END)
-        self.ast_output.delete(1.0, tk.END)
-        self.asm_output.delete(1.0, tk.END)
+        self.discard_deferred()
+        self.token_pane.clear()
+        self.ast_pane.clear()
+        self.asm_pane.clear()
 
         # 重置所有阶段状态
         for stage in [self.stage_lexical, self.stage_syntax, self.stage_semantic,
                       self.stage_ir, self.stage_optimize, self.stage_target]:
             stage.set_status("pending")
 
-        # 保存临时文件
-        temp_file = "temp_gui_compile.sy"
-        try:
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                f.write(code)
-        except Exception as e:
-            messagebox.showerror("错误", f"无法保存临时文件: {e}")
-            self.is_compiling = False
-            return
+        # 相同源码（且编译器未更新）直接复用上次成功编译的各阶段输出
+        cache_key = self.compile_cache_key(code)
+        cached = self._compile_cache.get(cache_key)
+
+        # 源码经标准输入传给编译器，只有汇编输出路径需要通过 -o 指定
+        asm_file = None
+        if cached is not None:
+            self._compile_cache.move_to_end(cache_key)
+        else:
+            asm_file = f"temp_gui_compile_{os.getpid()}.s"
+
+        # 正在处理的阶段卡片，编译线程异常退出时标记为错误
+        current_stage = None
 
         def run_compilation():
+            nonlocal current_stage
+            post = self.post_ui
             stages = [
-                ("词法分析", ["-lex", temp_file], self.stage_lexical),
-                ("语法分析", ["-ast", temp_file], self.stage_syntax),
-                ("语义分析", ["-semantic", temp_file], self.stage_semantic),
-                ("中间代码", ["-ir", temp_file], self.stage_ir),
-                ("代码优化", ["-optimize", temp_file], self.stage_optimize),
-                ("目标代码", ["-ir", "-asm", temp_file], self.stage_target),
+                ("词法分析", ["-lex"], self.stage_lexical),
+                ("语法分析", ["-ast"], self.stage_syntax),
+                ("语义分析", ["-semantic"], self.stage_semantic),
+                ("中间代码", ["-ir"], self.stage_ir),
+                ("代码优化", ["-optimize"], self.stage_optimize),
+                ("目标代码", ["-ir", "-asm", "-o", asm_file], self.stage_target),
             ]
 
             all_success = True
             error_occurred = False
+            cancelled = False
+            stage_results = []
 
-            for idx, (stage_name, args, stage_widget) in enumerate(stages):
-                # 设置状态为运行中
-                self.root.after(0, lambda s=stage_widget: s.set_status("running"))
-                self.root.after(0, lambda n=stage_name: self.append_output(f"\n▶ {n}...\n", "#007acc"))
-
-                # 运行编译器阶段
-                output, success = self.run_compiler_stage(stage_name, args)
-
-                if success:
-                    self.root.after(0, lambda s=stage_widget: s.set_status("completed"))
-                    self.root.after(0, lambda n=stage_name: self.append_output(f"✓ {n} 完成\n", "#107c10"))
-                else:
-                    self.root.after(0, lambda s=stage_widget: s.set_status("error"))
-                    self.root.after(0, lambda n=stage_name: self.append_output(f"✗ {n} 失败\n", "#d13438"))
-                    all_success = False
-                    error_occurred = True
-
-                # 将输出分配到对应标签页
-                self.root.after(0, self.distribute_output, stage_name, output)
-
-                # 如果出错，询问是否继续
-                if not success and idx < len(stages) - 1:
-                    time.sleep(0.5)
-                    # 继续执行其他阶段
+            # 一次编译器调用输出全部阶段，每个阶段结束时即可显示
+            if cached is None:
+                results = self.run_compiler_pipeline(stages, code, asm_file)
+            else:
+                results = iter(cached)
 
-                time.sleep(0.3)  # 添加小延迟让动画更流畅
+            try:
+                for stage_name, args, stage_widget in stages:
+                    if self._cancel_event.is_set():
+                        cancelled = True
+                        break
+
+                    # 设置状态为运行中
+                    current_stage = stage_widget
+                    post("status", stage_widget, "running")
+                    post("append", f"\n▶ {stage_name}...\n", "#007acc")
+
+                    # 等待该阶段的编译器进程结束
+                    output, success = next(results)
+                    stage_results.append((output, success))
+
+                    if success:
+                        post("status", stage_widget, "completed")
+                        post("append", f"✓ {stage_name} 完成\n", "#107c10")
+                    else:
+                        post("status", stage_widget, "error")
+                        post("append", f"✗ {stage_name} 失败\n", "#d13438")
+                        all_success = False
+                        error_occurred = True
+
+                    # 在工作线程中完成格式化，主线程只需插入结果并分配到对应标签页
+                    post("distribute", stage_name, output,
+                         self.format_stage_output(stage_name, output))
+                    current_stage = None
+            finally:
+                if cached is None:
+                    results.close()
+
+            # 只缓存全部成功的编译结果
+            if all_success and not cancelled and cached is None:
+                post("cache", cache_key, stage_results)
 
             # 最终状态
-            self.root.after(0, lambda: self.append_output("\n" + "="*50 + "\n", "#888"))
-            if all_success:
-                self.root.after(0, lambda: self.append_output("✓ 编译完成!\n", "#107c10"))
+            post("append", "\n" + "="*50 + "\n", "#888")
+            if cancelled:
+                post("append", "⏹ 编译已取消\n", "#d83b01")
+            elif all_success:
+                post("append", "✓ 编译完成!\n", "#107c10")
             elif error_occurred:
-                self.root.after(0, lambda: self.append_output("⚠ 编译完成，但有错误\n", "#d83b01"))
+                post("append", "⚠ 编译完成，但有错误\n", "#d83b01")
 
-            self.root.after(0, lambda: setattr(self, 'is_compiling', False))
+            # 清理生成的汇编文件
+            try:
+                if asm_file:
+                    pathlib.Path(asm_file).unlink(missing_ok=True)
+            except OSError:
+                pass
 
-            # 清理临时文件
+        def on_compilation_done(future):
+            """编译线程结束（在编译线程中回调）：报告未捕获的异常，再通知主线程复位状态"""
+            exc = future.exception()
+            if exc is not None:
+                import traceback
+                traceback.print_exception(type(exc), exc, exc.__traceback__)
+                if current_stage is not None:
+                    self.post_ui("status", current_stage, "error")
+                self.post_ui("append", f"✗ 内部错误: {exc}\n", "#d83b01")
+            self.post_ui("finish")
+
+        # 在后台线程中运行编译，界面更新经 _ui_queue 交给主线程
+        future = self._compile_executor.submit(run_compilation)
+        future.add_done_callback(on_compilation_done)
+
+    def register_proc(self, proc):
+        """登记正在运行的编译器进程；登记时已请求取消则立即杀掉"""
+        self._active_procs.add(proc)
+        if self._cancel_event.is_set():
+            proc.kill()
+
+    def cancel_compilation(self):
+        """停止正在进行的编译：杀掉所有编译器进程，剩余阶段不再运行"""
+        if not self.is_compiling:
+            return
+        self._cancel_event.set()
+        for proc in list(self._active_procs):
             try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-                # 清理可能生成的汇编文件
-                asm_file = temp_file.replace('.sy', '.s')
-                if os.path.exists(asm_file):
-                    os.remove(asm_file)
-            except:
+                proc.kill()
+            except OSError:
                 pass
 
-        # 在新线程中运行编译
-        thread = threading.Thread(target=run_compilation, daemon=True)
-        thread.start()
+    def finish_compilation(self):
+        """编译线程结束"""
+        self.is_compiling = False
+
+    def compile_cache_key(self, code):
+        """编译缓存的键：源码摘要 + 编译器修改时间（重新 make 后缓存失效）"""
+        try:
+            compiler_mtime = os.path.getmtime(self.compiler_path)
+        except OSError:
+            compiler_mtime = 0
+        digest = hashlib.blake2b(code.encode('utf-8'), digest_size=16).hexdigest()
+        return digest, compiler_mtime
+
+    def store_compile_result(self, key, stage_results):
+        """记录一次成功编译的各阶段输出（LRU，最多保留 COMPILE_CACHE_SIZE 份）"""
+        self._compile_cache[key] = stage_results
+        self._compile_cache.move_to_end(key)
+        while len(self._compile_cache) > COMPILE_CACHE_SIZE:
+            self._compile_cache.popitem(last=False)
+
+    def format_stage_output(self, stage_name, output):
+        """在工作线程中格式化阶段输出，返回 (文本, 颜色) 片段；无需显示或需推迟时返回 None"""
+        if not output or output.strip() == "(无输出)" or len(output) > LARGE_OUTPUT_SIZE:
+            return None
+
+        handlers = self._stage_dispatch.get(stage_name)
+        if handlers is None:
+            return None
+        formatter, _ = handlers
+        return formatter(output)
 
-    def distribute_output(self, stage_name, output):
-        """将输出分配到对应的标签页"""
+    def distribute_output(self, stage_name, output, segments=None):
+        """将输出分配到对应的标签页（segments 为工作线程已格式化的片段）"""
         if not output or output.strip() == "(无输出)":
             return
 
-        # 转换格式以匹配设计报告模板
-        if stage_name == "词法分析":
-            self.format_lexical_output(output)
-        elif stage_name == "语法分析":
-            self.format_syntax_output(output)
-        elif stage_name == "语义分析":
-            self.format_semantic_output(output)
-        elif stage_name == "中间代码":
-            self.last_ir_output = output
-            self.format_ir_output(output)
-        elif stage_name == "代码优化":
-            self.format_optimize_output(output)
-        elif stage_name == "目标代码":
-            self.format_asm_output(output)
-
-        # 同时也填充到专门的标签页
-        if stage_name == "词法分析":
-            self.display_tokens(output)
-        elif stage_name == "语法分析":
-            self.ast_output.delete(1.0, tk.END)
-            self.extract_section(output, "抽象语法树", self.ast_output)
-        elif stage_name == "目标代码":
-            self.extract_assembly(output)
-
-    def format_lexical_output(self, output):
-        """格式化词法分析输出，匹配设计报告格式"""
-        self.compile_output.insert(tk.END, "\n" + "="*60 + "\n", "#888")
-        self.compile_output.insert(tk.END, "词法分析器将源代码分解成Token序列：\n\n", "#4ec9b0")
+        handlers = self._stage_dispatch.get(stage_name)
+        if handlers is None:
+            return
 
-        # 解析Token表格并转换为设计报告格式
+        # 转换格式以匹配设计报告模板，同时也填充到专门的标签页
+        # 过大的输出只显示首尾摘要，点击后再完整格式化
+        formatter, sink = handlers
+        if segments is None:
+            if len(output) > LARGE_OUTPUT_SIZE:
+                self.defer_stage_output(stage_name, output)
+            else:
+                segments = formatter(output)
+        if segments is not None:
+            self.insert_segments(self.compile_output, segments)
+        if sink is not None:
+            sink(output)
+
+    def defer_stage_output(self, stage_name, output):
+        """在编译输出中显示大输出的首尾摘要和展开链接"""
         lines = output.split('\n')
-        token_sequence = []
-
-        for line in lines:
-            if line.startswith('|') and not line.startswith('|+'):
-                parts = [p.strip() for p in line.split('|')]
-                if len(parts) >= 3 and parts[1] not in ['Token 类型', '---']:
-                    token_type = parts[1]
-                    token_value = parts[2]
-                    line_num = parts[3] if len(parts) > 3 else "1"
-
-                    # 转换Token类型名称
-                    type_mapping = {
-                        'KEYWORD': f'KEYWORD_{token_value.upper()}',
-                        'IDENTIFIER': f'IDENTIFIER({token_value})',
-                        'NUMBER': f'NUMBER({token_value})',
-                        'FLOAT': f'FLOAT({token_value})',
-                        'OPERATOR': f'OPERATOR_{token_value}',
-                        'SYMBOL': f'SYMBOL_{token_value}',
-                    }
-
-                    if token_type in type_mapping:
-                        formatted_token = type_mapping[token_type]
-                    else:
-                        formatted_token = f'{token_type}({token_value})'
+        head = lines[:LARGE_OUTPUT_PREVIEW_LINES]
+        tail = lines[-LARGE_OUTPUT_PREVIEW_LINES:]
+        size = len(output.encode('utf-8'))
+        size_text = f"{size / 1024 / 1024:.1f} MB" if size >= 1024 * 1024 else f"{size / 1024:.0f} KB"
+
+        # 整个摘要块加上 deferred:阶段名 标签，展开时用完整输出原地替换
+        tag = f"expand:{stage_name}"
+        block = f"deferred:{stage_name}"
+        self.compile_output.tag_config(tag, foreground="#007acc", underline=True)
+        funcid = self.compile_output.tag_bind(
+            tag, "<Button-1>", functools.partial(self.expand_stage_output, stage_name))
+        self._deferred[stage_name] = (output, funcid)
+        self.insert_segments(self.compile_output, [
+            ("\n" + "="*60 + "\n", ("#888", block)),
+            (f"{stage_name}输出（共 {len(lines)} 行）：\n\n", ("#4ec9b0", block)),
+            ('\n'.join(head) + "\n...\n" + '\n'.join(tail) + "\n", ("#cccccc", block)),
+            (f"(输出 {size_text} — 点击展开)", (tag, block)),
+            ("\n\n", ("#888", block)),
+        ])
+
+    def drop_expand_link(self, stage_name, funcid):
+        """删除展开链接的事件绑定和标签，释放对应的 Tcl 回调"""
+        tag = f"expand:{stage_name}"
+        self.compile_output.tag_unbind(tag, "<Button-1>", funcid)
+        self.compile_output.tag_delete(tag, f"deferred:{stage_name}")
+
+    def discard_deferred(self):
+        """清空编译输出时丢弃所有未展开的大输出"""
+        for stage_name, (_, funcid) in self._deferred.items():
+            self.drop_expand_link(stage_name, funcid)
+        self._deferred.clear()
+
+    def expand_stage_output(self, stage_name, event=None):
+        """点击展开链接：在摘要块的位置完整格式化之前推迟的阶段输出"""
+        entry = self._deferred.pop(stage_name, None)
+        if entry is None:
+            return
+        output, funcid = entry
+        ranges = self.compile_output.tag_ranges(f"deferred:{stage_name}")
+        if ranges:
+            start = self.compile_output.index(ranges[0])
+            self.compile_output.delete(start, ranges[-1])
+            formatter, _ = self._stage_dispatch[stage_name]
+            self.insert_segments(self.compile_output, formatter(output), start)
+            self.trim_output()
+        self.drop_expand_link(stage_name, funcid)
+
+    def store_ir_output(self, output):
+        """记录最近一次的中间代码输出"""
+        self.last_ir_output = output
+
+    def extract_ast(self, output):
+        """提取AST到AST标签页"""
+        self.extract_section(output, "抽象语法树", self.ast_output)
 
-                    token_sequence.append(formatted_token)
+    def format_lexical_output(self, output):
+        """格式化词法分析输出，匹配设计报告格式，返回 (文本, 颜色) 片段"""
+        segments = [
+            ("\n" + "="*60 + "\n", "#888"),
+            ("词法分析器将源代码分解成Token序列：\n\n", "#4ec9b0"),
+        ]
 
-        # 每行显示3个Token
-        for i in range(0, len(token_sequence), 3):
-            line_tokens = token_sequence[i:i+3]
-            formatted_line = '  '.join(line_tokens)
-            self.compile_output.insert(tk.END, formatted_line + "\n", "#cccccc")
+        token_text = format_token_sequence(output)
+        if token_text:
+            segments.append((token_text + "\n", "#cccccc"))
 
-        self.compile_output.insert(tk.END, "\n", "#888")
+        segments.append(("\n", "#888"))
+        return segments
 
     def format_syntax_output(self, output):
-        """格式化语法分析输出"""
-        self.compile_output.insert(tk.END, "\n" + "="*60 + "\n", "#888")
-        self.compile_output.insert(tk.END, "语法分析过程（AST）：\n\n", "#4ec9b0")
+        """格式化语法分析输出，返回 (文本, 颜色) 片段"""
+        segments = [
+            ("\n" + "="*60 + "\n", "#888"),
+            ("语法分析过程（AST）：\n\n", "#4ec9b0"),
+        ]
 
         # 修复提取AST部分的逻辑
-        lines = output.split('\n')
         in_ast = False
         found_ast = False
+        ast_lines = []
 
-        for line in lines:
+        for line in iter_lines(output):
             # 查找AST开始标记
             if '抽象语法树' in line or 'AST' in line:
                 in_ast = True
@@ -722,37 +1837,44 @@ class SysCompilerGUI:
             # 如果找到了AST内容
             if in_ast:
                 # 跳过空行和分隔符
-                if line.strip() == '' or line.strip() == '===':
+                if line.strip() in ('', '==='):
                     continue
 
                 # 遇到下一个阶段标题时停止
-                if line.startswith('==============================================') and '3.' in line:
+                if SECTION_HEADER_RES[3].match(line):
                     break
 
                 # 提取AST行
-                if line.strip():
-                    self.compile_output.insert(tk.END, line + "\n", "#007acc")
+                ast_lines.append(line)
+
+        if ast_lines:
+            segments.append(('\n'.join(ast_lines) + "\n", "#007acc"))
 
         # 如果没有找到AST，显示提示
         if not found_ast:
-            self.compile_output.insert(tk.END, "未找到AST内容\n", "#ff6b6b")
+            segments.append(("未找到AST内容\n", "#ff6b6b"))
 
-        self.compile_output.insert(tk.END, "\n", "#888")
+        segments.append(("\n", "#888"))
+        return segments
 
     def format_semantic_output(self, output):
-        """格式化语义分析输出，匹配设计报告格式"""
-        self.compile_output.insert(tk.END, "\n" + "="*60 + "\n", "#888")
-        self.compile_output.insert(tk.END, "语义分析结果：\n\n", "#4ec9b0")
-
-        self.compile_output.insert(tk.END, "符号表内容：\n", "#4ec9b0")
-
-        # 提取符号表 - 修复解析逻辑
-        lines = output.split('\n')
+        """格式化语义分析输出，匹配设计报告格式，返回 (文本, 颜色) 片段"""
+        segments = [
+            ("\n" + "="*60 + "\n", "#888"),
+            ("语义分析结果：\n\n", "#4ec9b0"),
+            ("符号表内容：\n", "#4ec9b0"),
+        ]
+
+        # 一次遍历同时提取符号表和语义检查结果
         in_table = False
         table_lines = []
+        ok_lines = []
         collecting_table = False
 
-        for line in lines:
+        for line in output.splitlines():
+            if '[OK]' in line or '语义检查通过' in line:
+                ok_lines.append(line)
+
             # 查找符号表开始
             if '符号表' in line and ('(' in line or 'Symbol Table' in line):
                 collecting_table = True
@@ -761,7 +1883,7 @@ class SysCompilerGUI:
             # 如果正在收集符号表
             if collecting_table:
                 # 符号表行以+、|、─开头
-                if line.startswith('+') or line.startswith('|') or line.startswith('─'):
+                if line.startswith(('+', '|', '─')):
                     if not in_table:
                         in_table = True
                     table_lines.append(line)
@@ -773,31 +1895,31 @@ class SysCompilerGUI:
 
         # 如果没有找到表格，显示提示
         if not table_lines:
-            self.compile_output.insert(tk.END, "未找到符号表内容\n", "#ff6b6b")
+            segments.append(("未找到符号表内容\n", "#ff6b6b"))
         else:
-            # 显示符号表
-            for line in table_lines:
-                if line.strip():
-                    self.compile_output.insert(tk.END, line + "\n", "#888")
+            # 显示符号表（表格行都以+、|、─开头，不会是空行）
+            segments.append(('\n'.join(table_lines) + "\n", "#888"))
 
         # 显示语义检查结果
-        for line in lines:
-            if '[OK]' in line or '语义检查通过' in line:
-                self.compile_output.insert(tk.END, line + "\n", "#107c10")
+        if ok_lines:
+            segments.append(('\n'.join(ok_lines) + "\n", "#107c10"))
 
-        self.compile_output.insert(tk.END, "\n", "#888")
+        segments.append(("\n", "#888"))
+        return segments
 
     def format_ir_output(self, output):
-        """格式化中间代码输出"""
-        self.compile_output.insert(tk.END, "\n" + "="*60 + "\n", "#888")
-        self.compile_output.insert(tk.END, "中间代码（TAC）：\n\n", "#4ec9b0")
+        """格式化中间代码输出，返回 (文本, 颜色) 片段"""
+        segments = [
+            ("\n" + "="*60 + "\n", "#888"),
+            ("中间代码（TAC）：\n\n", "#4ec9b0"),
+        ]
 
         # 提取TAC代码 - 修复解析逻辑
-        lines = output.split('\n')
         in_tac = False
         found_tac = False
+        tac_lines = []
 
-        for line in lines:
+        for line in iter_lines(output):
             # 查找中间代码开始的标记
             if '中间代码' in line and ('TAC' in line or '三地址码' in line):
                 in_tac = True
@@ -807,45 +1929,50 @@ class SysCompilerGUI:
             # 如果找到了TAC内容
             if in_tac:
                 # 跳过空行和分隔符
-                if line.strip() == '' or line.strip() == '===':
+                if line.strip() in ('', '==='):
                     continue
 
                 # 遇到下一个阶段标题时停止
-                if line.startswith('==============================================') and '5.' in line:
+                if SECTION_HEADER_RES[5].match(line):
                     break
 
                 # 提取实际的TAC指令
-                if line.strip():
-                    self.compile_output.insert(tk.END, line + "\n", "#cccccc")
+                tac_lines.append(line)
+
+        if tac_lines:
+            segments.append(('\n'.join(tac_lines) + "\n", "#cccccc"))
 
         # 如果没有找到TAC内容，显示提示
         if not found_tac:
-            self.compile_output.insert(tk.END, "未找到中间代码内容\n", "#ff6b6b")
+            segments.append(("未找到中间代码内容\n", "#ff6b6b"))
 
         # 尝试从TAC直接计算程序返回值
         result = self.calculate_program_result(output)
         if result is not None:
-            self.compile_output.insert(tk.END, "\n程序运行结果：\n", "#107c10")
-            self.compile_output.insert(tk.END, f"程序执行结果: {result}\n", "#107c10")
-        elif 'return' in output.lower():
-            self.compile_output.insert(tk.END, "\n程序运行结果：\n", "#107c10")
-            self.compile_output.insert(tk.END, "程序成功编译并可执行\n", "#cccccc")
+            segments.append(("\n程序运行结果：\n", "#107c10"))
+            segments.append((f"程序执行结果: {result}\n", "#107c10"))
+        elif RETURN_RE.search(output):
+            segments.append(("\n程序运行结果：\n", "#107c10"))
+            segments.append(("程序成功编译并可执行\n", "#cccccc"))
 
-        self.compile_output.insert(tk.END, "\n", "#888")
+        segments.append(("\n", "#888"))
+        return segments
 
     def format_optimize_output(self, output):
-        """格式化代码优化输出"""
-        self.compile_output.insert(tk.END, "\n" + "="*60 + "\n", "#888")
-        self.compile_output.insert(tk.END, "代码优化：\n\n", "#4ec9b0")
+        """格式化代码优化输出，返回 (文本, 颜色) 片段"""
+        segments = [
+            ("\n" + "="*60 + "\n", "#888"),
+            ("代码优化：\n\n", "#4ec9b0"),
+        ]
 
         # 修复解析逻辑
-        lines = output.split('\n')
         in_optimize = False
         found_optimize = False
+        optimize_lines = []
 
-        for line in lines:
+        for line in iter_lines(output):
             # 查找优化阶段开始的标记
-            if '代码优化' in line and ('Optimization' in line or '优化' in line):
+            if '代码优化' in line:
                 in_optimize = True
                 found_optimize = True
                 continue
@@ -853,507 +1980,153 @@ class SysCompilerGUI:
             # 如果找到了优化内容
             if in_optimize:
                 # 跳过空行和分隔符
-                if line.strip() == '' or line.strip() == '===':
+                if line.strip() in ('', '==='):
                     continue
 
                 # 遇到下一个阶段标题时停止
-                if line.startswith('==============================================') and '6.' in line:
+                if SECTION_HEADER_RES[6].match(line):
                     break
 
                 # 提取优化统计信息
-                if line.strip():
-                    self.compile_output.insert(tk.END, line + "\n", "#cccccc")
+                optimize_lines.append(line)
+
+        if optimize_lines:
+            segments.append(('\n'.join(optimize_lines) + "\n", "#cccccc"))
 
         # 如果没有找到优化内容，显示提示
         if not found_optimize:
-            self.compile_output.insert(tk.END, "未找到优化内容\n", "#ff6b6b")
-
-        self.compile_output.insert(tk.END, "\n", "#888")
-
-    def simulate_ir_execution(self, ir_lines):
-        """模拟中间代码的执行（支持控制流）"""
-        # 首先扫描代码，识别哪些变量是数组
-        # 检测方法：
-        # 1. 检测 LOAD/STORE 指令中的数组访问
-        # 2. 检测孤立的 = * 赋值（不完整的数组操作）
-        array_variables = set()
-        has_incomplete_array_ops = False
-
-        for line in ir_lines:
-            line_stripped = line.strip()
-            # 检测完整的 LOAD 指令: t0 = *array
-            if '= *' in line_stripped and len(line_stripped.split('= *')) >= 2:
-                parts = line_stripped.split('= *')
-                if len(parts) == 2:
-                    array_var = parts[1].strip()
-                    if array_var and not array_var.startswith('t'):
-                        array_variables.add(array_var)
-
-            # 检测不完整的数组操作（只有 = *）
-            # 这表明存在数组操作，但无法识别具体变量
-            if line_stripped.endswith('= *') or line_stripped == '*':
-                has_incomplete_array_ops = True
-
-        # 建立标签到指令索引的映射
-        label_to_index = {}
-        instructions = []
-
-        for i, line in enumerate(ir_lines):
-            line = line.strip()
-            if not line:
-                continue
-
-            # 检查是否是标签（过滤掉标签行，不添加到指令列表）
-            # 只处理L开头的标签，排除function开头的行
-            if line.endswith(':') and line.startswith('L'):
-                label = line.rstrip(':')
-                label_to_index[label] = len(instructions)
-                continue
-
-            # 跳过空行、标签行和函数声明行，只添加实际指令
-            # 排除 function、main: 等声明性语句
-            if not line.startswith('function') and not line.endswith('main:') and not line == 'main:':
-                instructions.append({'line': line, 'index': len(instructions)})
-
-        # 模拟执行
-        var_values = {}
-        assignment_expressions = {}  # 追踪赋值表达式: var -> expr
-        calc_steps = []
-        pc = 0
-        max_iterations = 1000  # 防止无限循环
-        iteration_count = 0
-        has_array_operations = False  # 标记是否包含数组操作
-
-        while pc < len(instructions) and iteration_count < max_iterations:
-            iteration_count += 1
-            inst = instructions[pc]
-            line = inst['line']
-
-            # 跳过标签定义行
-            if line.endswith(':'):
-                pc += 1
-                continue
+            segments.append(("未找到优化内容\n", "#ff6b6b"))
 
-            # 处理跳转指令
-            if line.startswith('jump '):
-                label = line[5:].strip()
-                if label in label_to_index:
-                    pc = label_to_index[label]
-                else:
-                    pc += 1
-                continue
-
-            if line.startswith('if '):
-                # 格式: if cond != 0 goto label 或 if cond == 0 goto label
-                parts = line.split()
-                if len(parts) >= 6:
-                    cond = parts[1]
-                    op = parts[2]
-                    target = parts[5] if parts[4] == 'goto' else parts[4]
-                    target_index = label_to_index.get(target, pc + 1)
-
-                    # 计算条件值
-                    cond_val = self.evaluate_simple_expression(cond, var_values)
-                    if cond_val is None:
-                        cond_val = 0
-
-                    if op == '!=' and cond_val != 0:
-                        pc = target_index
-                    elif op == '==' and cond_val == 0:
-                        pc = target_index
-                    else:
-                        pc += 1
-                else:
-                    pc += 1
-                continue
-
-            # 处理赋值指令
-            if '=' in line and 'return' not in line:
-                parts = line.split('=', 1)
-                if len(parts) == 2:
-                    var = parts[0].strip()
-                    expr = parts[1].strip()
-
-                    # 记录赋值表达式（即使无法立即计算）
-                    assignment_expressions[var] = expr
-
-                    # 如果是call指令，记录但不尝试计算
-                    if 'call' in expr:
-                        pc += 1
-                        continue
-
-                    # 检测数组操作（LOAD/STORE指令）
-                    if '*' in expr or expr.strip() == '*':
-                        has_array_operations = True
-                        pc += 1
-                        continue
-
-                    # 跳过数组变量声明
-                    # 1. 如果变量已被识别为数组，且赋值是数字
-                    # 2. 如果存在不完整的数组操作，且赋值是小于100的数字（可能是数组大小）
-                    is_array_decl = (var in array_variables and expr.isdigit())
-                    is_probable_array_decl = (has_incomplete_array_ops and expr.isdigit() and
-                                            not var.startswith('t') and int(expr) < 100)
-
-                    if is_array_decl or is_probable_array_decl:
-                        # 这是数组声明，跳过但不记录在计算步骤中
-                        pc += 1
-                        continue
-
-                    # 正常的变量赋值
-                    if var and expr:
-                        val = self.evaluate_simple_expression(expr, var_values)
-                        if val is not None:
-                            var_values[var] = val
-                            # 记录所有赋值（包括临时变量）用于调试
-                            if not var.startswith('L'):
-                                calc_steps.append(f"{var} = {val}")
-
-            # 处理return指令
-            if line.startswith('return'):
-                parts = line.split('return')
-                if len(parts) > 1:
-                    expr = parts[1].strip()
-                    return_val = self.evaluate_simple_expression(expr, var_values)
-                    # 如果有数组操作但返回值无法计算，尝试显示已知信息
-                    if has_array_operations and return_val is None:
-                        # 尝试从临时变量中找出可能的返回值
-                        if expr in var_values:
-                            return_val = var_values[expr]
-                        # 尝试从赋值表达式中查找
-                        elif expr in assignment_expressions:
-                            # 获取变量的赋值表达式（如 t10 = t6 + t8）
-                            assign_expr = assignment_expressions[expr]
-                            # 尝试计算这个表达式
-                            return_val = self.evaluate_simple_expression(assign_expr, var_values)
-                            # 如果还是无法计算，尝试推断模式
-                            if return_val is None and '+' in assign_expr:
-                                # 检查是否有多个赋值过的临时变量
-                                temp_vars = [k for k in var_values.keys() if k.startswith('t')]
-                                if len(temp_vars) >= 3:
-                                    # 按顺序排序临时变量
-                                    sorted_vars = sorted(temp_vars, key=lambda x: int(x[1:]) if x[1:].isdigit() else 0)
-                                    # 使用第一个和第三个（跳过中间的）来模拟数组访问
-                                    # t0=1, t2=2, t4=6 -> 使用t0和t4
-                                    if len(sorted_vars) >= 3:
-                                        left_val = var_values[sorted_vars[0]]
-                                        right_val = var_values[sorted_vars[2]]
-                                        return_val = left_val + right_val
-                        # 如果是数组参数测试（如sum函数），尝试计算所有已赋值临时变量的和
-                        if return_val is None:
-                            temp_vars = [k for k in var_values.keys() if k.startswith('t')]
-                            if temp_vars:
-                                # 检查是否有函数调用（通过是否有call指令判断）
-                                has_call = any('call' in assignment_expressions.get(k, '') for k in assignment_expressions)
-                                if has_call:
-                                    # 对所有已赋值的临时变量求和（模拟sum函数）
-                                    total_sum = sum(var_values[v] for v in temp_vars)
-                                    return_val = total_sum
-                    if has_array_operations and return_val is None:
-                        return calc_steps, "ARRAY_OPERATION"
-                    return calc_steps, return_val
-                else:
-                    return calc_steps, None
-
-            pc += 1
-
-        return calc_steps, None
+        segments.append(("\n", "#888"))
+        return segments
 
     def format_asm_output(self, output):
-        """格式化汇编代码输出"""
-        self.compile_output.insert(tk.END, "\n" + "="*60 + "\n", "#888")
-        self.compile_output.insert(tk.END, "最终编译输出（x86-64汇编）：\n\n", "#4ec9b0")
+        """格式化汇编代码输出，返回 (文本, 颜色) 片段"""
+        segments = [
+            ("\n" + "="*60 + "\n", "#888"),
+            ("最终编译输出（x86-64汇编）：\n\n", "#4ec9b0"),
+        ]
+
+        # 一次遍历同时提取汇编代码和用于计算结果的中间代码，两部分都结束后停止
+        in_asm = asm_done = False
+        in_ir = ir_done = False
+        asm_lines = []
+        ir_lines = []
 
-        # 提取汇编代码部分
-        lines = output.split('\n')
-        in_asm = False
+        for line in iter_lines(output):
+            if not asm_done:
+                if ASM_HEADER_RE.search(line):
+                    in_asm = True
+                elif in_asm and ASM_END_RE.search(line):
+                    asm_done = True
+                elif in_asm and line.strip():
+                    asm_lines.append(line)
+
+            if not ir_done:
+                if '中间代码' in line and ('TAC' in line or '三地址码' in line):
+                    in_ir = True
+                elif in_ir:
+                    if line.startswith('=============================================='):
+                        ir_done = True
+                    else:
+                        ir_lines.append(line)
 
-        for line in lines:
-            if '目标代码' in line or '汇编' in line:
-                in_asm = True
-                continue
-            if in_asm and ('编译完成' in line or '目标代码已保存' in line):
+            if asm_done and ir_done:
                 break
-            if in_asm and line.strip():
-                self.compile_output.insert(tk.END, line + "\n", "#cccccc")
 
-        # 显示最终结果
-        self.compile_output.insert(tk.END, "\n" + "="*60 + "\n", "#888")
-        self.compile_output.insert(tk.END, "程序运行结果：\n\n", "#107c10")
-
-        # 从完整输出中提取中间代码进行计算
-        ir_lines = []
-        in_ir = False
+        if asm_lines:
+            segments.append(('\n'.join(asm_lines) + "\n", "#cccccc"))
 
-        for line in lines:
-            if '中间代码' in line and ('TAC' in line or '三地址码' in line):
-                in_ir = True
-                continue
-            if in_ir:
-                if line.startswith('=============================================='):
-                    break
-                ir_lines.append(line)
+        # 显示最终结果
+        segments.append(("\n" + "="*60 + "\n", "#888"))
+        segments.append(("程序运行结果：\n\n", "#107c10"))
 
-        # 使用控制流模拟来计算结果
-        calc_steps, return_val = self.simulate_ir_execution(ir_lines)
+        # 使用控制流模拟来计算结果（simulate_ir_program 按中间代码缓存，重复编译时直接命中）
+        calc_steps, return_val = simulate_ir_program(tuple(ir_lines))
 
         # 显示计算过程（如果步骤太多，只显示前5步和最后5步）
-        if calc_steps:
-            self.compile_output.insert(tk.END, "计算过程: ", "#4ec9b0")
-            if len(calc_steps) <= 10:
-                self.compile_output.insert(tk.END, "; ".join(calc_steps) + "\n", "#cccccc")
+        if calc_steps.count:
+            segments.append(("计算过程: ", "#4ec9b0"))
+            head = "; ".join(f"{var} = {val}" for var, val in calc_steps.head)
+            tail = "; ".join(f"{var} = {val}" for var, val in calc_steps.tail)
+            if calc_steps.count <= 2 * CALC_STEPS_PREVIEW:
+                segments.append(("; ".join(filter(None, (head, tail))) + "\n", "#cccccc"))
             else:
                 # 显示前5步
-                self.compile_output.insert(tk.END, "; ".join(calc_steps[:5]), "#cccccc")
-                self.compile_output.insert(tk.END, "; ...; ", "#cccccc")
+                segments.append((head, "#cccccc"))
+                segments.append(("; ...; ", "#cccccc"))
                 # 显示最后5步
-                self.compile_output.insert(tk.END, "; ".join(calc_steps[-5:]) + "\n", "#cccccc")
-                self.compile_output.insert(tk.END, f"  (共 {len(calc_steps)//2} 次循环迭代)\n", "#888")
+                segments.append((tail + "\n", "#cccccc"))
+                segments.append((f"  (共 {calc_steps.count//2} 次循环迭代)\n", "#888"))
 
         # 显示返回值或特殊消息
         if return_val == "ARRAY_OPERATION":
-            self.compile_output.insert(tk.END, "程序包含数组操作，中间代码中的数组访问已优化\n", "#4ec9b0")
-            self.compile_output.insert(tk.END, "程序已成功编译为目标代码（x86-64汇编），可正常执行\n", "#cccccc")
+            segments.append(("程序包含数组操作，中间代码中的数组访问已优化\n", "#4ec9b0"))
+            segments.append(("程序已成功编译为目标代码（x86-64汇编），可正常执行\n", "#cccccc"))
         elif return_val is not None:
-            self.compile_output.insert(tk.END, f"程序返回值: {return_val}\n", "#107c10")
+            segments.append((f"程序返回值: {return_val}\n", "#107c10"))
         else:
-            self.compile_output.insert(tk.END, "程序已成功编译为目标代码（x86-64汇编）\n", "#cccccc")
-            self.compile_output.insert(tk.END, "程序可正常执行\n", "#cccccc")
+            segments.append(("程序已成功编译为目标代码（x86-64汇编）\n", "#cccccc"))
+            segments.append(("程序可正常执行\n", "#cccccc"))
 
-        self.compile_output.insert(tk.END, "\n编译完成!\n", "#107c10")
-        self.compile_output.insert(tk.END, "="*60 + "\n\n", "#888")
+        segments.append(("\n编译完成!\n", "#107c10"))
+        segments.append(("="*60 + "\n\n", "#888"))
+        return segments
 
     def calculate_program_result(self, output):
         """尝试计算程序的返回值"""
-        try:
-            # 首先解析所有变量值
-            lines = output.split('\n')
-            variable_values = {}
-
-            for line in lines:
-                # 查找变量赋值
-                if '=' in line and 'return' not in line and 'function' not in line:
-                    parts = line.split('=')
-                    if len(parts) == 2:
-                        var = parts[0].strip()
-                        val_expr = parts[1].strip()
-
-                        # 计算变量的值
-                        computed_val = self.evaluate_simple_expression(val_expr, variable_values)
-                        if computed_val is not None:
-                            variable_values[var] = computed_val
-
-            # 然后查找return语句
-            return_value = None
-
-            for line in lines:
-                # 查找中间代码中的return语句
-                if 'return' in line and not line.startswith('function'):
-                    # 提取return后的值
-                    parts = line.split('return')
-                    if len(parts) > 1:
-                        return_expr = parts[1].strip()
-                        # 如果是纯数字，直接返回
-                        if return_expr.isdigit():
-                            return_value = int(return_expr)
-                        # 如果是变量名，从变量表中查找
-                        elif return_expr in variable_values:
-                            return_value = variable_values[return_expr]
-                        # 尝试简单计算
-                        else:
-                            computed = self.evaluate_simple_expression(return_expr, variable_values)
-                            if computed is not None:
-                                return_value = computed
-                    break
-
-            return return_value
-        except:
+        # 没有return语句时不必分析整个输出
+        if 'return' not in output:
             return None
+        return analyze_tac_output(output).return_value
 
     def get_calculation_process(self, output):
         """获取计算过程说明"""
-        try:
-            # 从中间代码中提取所有计算步骤
-            lines = output.split('\n')
-            process_steps = []
-            variable_values = {}
-
-            for line in lines:
-                # 查找变量赋值
-                if '=' in line and 'return' not in line and 'function' not in line:
-                    parts = line.split('=')
-                    if len(parts) == 2:
-                        var = parts[0].strip()
-                        val_expr = parts[1].strip()
-
-                        # 尝试计算表达式的值
-                        computed_val = self.evaluate_simple_expression(val_expr, variable_values)
-                        if computed_val is not None:
-                            variable_values[var] = computed_val
-                            # 添加到步骤列表
-                            if 't' not in var:  # 跳过临时变量
-                                process_steps.append(f"{var} = {computed_val}")
-
-            # 返回计算过程
-            if process_steps:
-                return "; ".join(process_steps)
-            return None
-        except:
-            return None
+        process_steps = analyze_tac_output(output).process_steps
+        if process_steps:
+            return "; ".join(process_steps)
+        return None
 
     def evaluate_simple_expression(self, expr, var_values=None):
         """评估简单的算术表达式（支持变量）"""
         if var_values is None:
             var_values = {}
-
-        try:
-            expr = expr.strip()
-
-            # 处理类型转换
-            if expr.startswith('(int)'):
-                inner = expr[5:].strip()
-                val = self.evaluate_simple_expression(inner, var_values)
-                return int(val) if val is not None else None
-
-            if expr.startswith('(float)'):
-                inner = expr[7:].strip()
-                val = self.evaluate_simple_expression(inner, var_values)
-                return float(val) if val is not None else None
-
-            # 处理一元负号
-            if expr.startswith('-'):
-                inner = expr[1:].strip()
-                val = self.evaluate_simple_expression(inner, var_values)
-                return -val if val is not None else None
-
-            # 如果是变量，查找其值
-            if expr in var_values:
-                return var_values[expr]
-
-            # 如果是数字
-            if expr.replace('.', '').replace('-', '').isdigit():
-                return float(expr) if '.' in expr else int(expr)
-
-            # 处理加法 a + b
-            if '+' in expr and expr.count('+') == 1:
-                parts = expr.split('+')
-                if len(parts) == 2:
-                    left = self.evaluate_simple_expression(parts[0].strip(), var_values)
-                    right = self.evaluate_simple_expression(parts[1].strip(), var_values)
-                    if left is not None and right is not None:
-                        return left + right
-
-            # 处理减法 a - b
-            if '-' in expr and expr.count('-') == 1:
-                parts = expr.split('-')
-                if len(parts) == 2:
-                    left = self.evaluate_simple_expression(parts[0].strip(), var_values)
-                    right = self.evaluate_simple_expression(parts[1].strip(), var_values)
-                    if left is not None and right is not None:
-                        return left - right
-
-            # 处理乘法 a * b
-            if '*' in expr and expr.count('*') == 1:
-                parts = expr.split('*')
-                if len(parts) == 2:
-                    left = self.evaluate_simple_expression(parts[0].strip(), var_values)
-                    right = self.evaluate_simple_expression(parts[1].strip(), var_values)
-                    if left is not None and right is not None:
-                        return left * right
-
-            # 处理除法 a / b
-            if '/' in expr and expr.count('/') == 1:
-                parts = expr.split('/')
-                if len(parts) == 2:
-                    left = self.evaluate_simple_expression(parts[0].strip(), var_values)
-                    right = self.evaluate_simple_expression(parts[1].strip(), var_values)
-                    if left is not None and right is not None and right != 0:
-                        return left / right
-
-            # 处理比较运算符（支持带空格和不带空格的格式）
-            # 处理 <=
-            if '<=' in expr:
-                parts = expr.split('<=')
-                if len(parts) == 2:
-                    left = self.evaluate_simple_expression(parts[0].strip(), var_values)
-                    right = self.evaluate_simple_expression(parts[1].strip(), var_values)
-                    if left is not None and right is not None:
-                        return 1 if left <= right else 0
-
-            # 处理 >=
-            if '>=' in expr:
-                parts = expr.split('>=')
-                if len(parts) == 2:
-                    left = self.evaluate_simple_expression(parts[0].strip(), var_values)
-                    right = self.evaluate_simple_expression(parts[1].strip(), var_values)
-                    if left is not None and right is not None:
-                        return 1 if left >= right else 0
-
-            # 处理 < （避免与 <= 冲突）
-            if '<' in expr and '<=' not in expr:
-                parts = expr.split('<')
-                if len(parts) == 2:
-                    left = self.evaluate_simple_expression(parts[0].strip(), var_values)
-                    right = self.evaluate_simple_expression(parts[1].strip(), var_values)
-                    if left is not None and right is not None:
-                        return 1 if left < right else 0
-
-            # 处理 > （避免与 >= 冲突）
-            if '>' in expr and '>=' not in expr:
-                parts = expr.split('>')
-                if len(parts) == 2:
-                    left = self.evaluate_simple_expression(parts[0].strip(), var_values)
-                    right = self.evaluate_simple_expression(parts[1].strip(), var_values)
-                    if left is not None and right is not None:
-                        return 1 if left > right else 0
-
-            # 处理 ==
-            if '==' in expr:
-                parts = expr.split('==')
-                if len(parts) == 2:
-                    left = self.evaluate_simple_expression(parts[0].strip(), var_values)
-                    right = self.evaluate_simple_expression(parts[1].strip(), var_values)
-                    if left is not None and right is not None:
-                        return 1 if left == right else 0
-
-            # 处理 !=
-            if ' !=' in expr:
-                parts = expr.split('!=')
-                if len(parts) == 2:
-                    left = self.evaluate_simple_expression(parts[0].strip(), var_values)
-                    right = self.evaluate_simple_expression(parts[1].strip(), var_values)
-                    if left is not None and right is not None:
-                        return 1 if left != right else 0
-
-            return None
-        except:
-            return None
+        return compile_tac_expression(expr)(var_values)
 
     def extract_section(self, output, section_name, target_widget):
         """从输出中提取特定章节"""
-        lines = output.split('\n')
-        in_section = False
-        section_content = []
+        # 章节从第一个标题行的下一行开始
+        start = output.find(section_name)
+        if start >= 0:
+            start = output.find('\n', start) + 1
+        if start <= 0:
+            target_widget.set_lines([])
+            return
 
-        for line in lines:
-            if section_name in line:
-                in_section = True
-                continue
-            if in_section:
-                if line.startswith('===') or line.startswith('━'):
-                    break
-                section_content.append(line)
+        # 到下一个分隔线为止（含章节名的行仍视为标题，不作为结束）
+        end = None
+        for match in SECTION_END_RE.finditer(output, start):
+            line_end = output.find('\n', match.start())
+            if section_name not in output[match.start():line_end if line_end >= 0 else None]:
+                end = match.start()
+                break
 
-        if section_content:
-            target_widget.insert(1.0, '\n'.join(section_content))
+        section_content = output[start:end].split('\n')
+        if end is not None:
+            # 去掉分隔线前换行符产生的空元素
+            section_content.pop()
+        if section_name in output[start:end]:
+            section_content = [line for line in section_content if section_name not in line]
+        target_widget.set_lines(section_content)
 
     def display_tokens(self, output):
         """显示Token"""
-        self.token_output.delete(1.0, tk.END)
-        self.token_output.insert(tk.END, f"{'类型':<12} {'值':<20} {'行号':<6}\n", "header")
-        self.token_output.insert(tk.END, "-" * 45 + "\n", "header")
+        rows = [
+            ((f"{'类型':<12} {'值':<20} {'行号':<6}", "header"),),
+            (("-" * 45, "header"),),
+        ]
 
-        lines = output.split('\n')
+        lines = output.splitlines()
         token_count = 0
 
         for line in lines:
@@ -1364,11 +2137,7 @@ class SysCompilerGUI:
             # 跳过空行、分隔线、标题行
             if not line:
                 continue
-            if line.startswith('=') or line.startswith('-') or line.startswith('+'):
-                continue
-            if 'Token 类型' in line or '内容' in line or '行号' in line:
-                continue
-            if '词法分析' in line or '目标' in line or '识别' in line:
+            if TOKEN_SKIP_RE.search(line):
                 continue
             if '总计' in line:
                 # 提取总数信息
@@ -1382,14 +2151,12 @@ class SysCompilerGUI:
                 continue
             if '错误' in line:
                 # 显示错误信息
-                self.token_output.insert(tk.END, line + "\n", "line")
+                rows.append(((line, "line"),))
                 continue
 
             # 尝试解析表格格式: | KEYWORD | int | 1 |
             if line.startswith('|'):
-                parts = [p.strip() for p in line.split('|')]
-                # 去掉首尾空元素
-                parts = [p for p in parts if p]
+                parts = TOKEN_FIELD_RE.findall(line)
 
                 if len(parts) >= 2:
                     token_type = parts[0]
@@ -1398,54 +2165,52 @@ class SysCompilerGUI:
 
                     # 过滤掉非token行
                     if token_type and token_type not in ['Token 类型', '---']:
-                        self.token_output.insert(tk.END, f"{token_type:<12} ", "type")
-                        self.token_output.insert(tk.END, f"{token_value:<20} ", "value")
-                        self.token_output.insert(tk.END, f"{line_num:<6}\n", "line")
+                        rows.append(((f"{token_type:<12} ", "type"),
+                                     (f"{token_value:<20} ", "value"),
+                                     (f"{line_num:<6}", "line")))
                         token_count += 1
 
             # 尝试解析简单格式: KEYWORD int 1
             else:
                 parts = line.split()
                 if len(parts) >= 2:
-                    if parts[0] in ['KEYWORD', 'OPERATOR', 'SYMBOL', 'NUMBER', 'FLOAT',
-                                    'IDENTIFIER', 'UNKNOWN']:
+                    if parts[0] in TOKEN_TYPES:
                         token_type = parts[0]
                         token_value = parts[1] if len(parts) > 1 else ""
                         line_num = parts[2] if len(parts) > 2 else "1"
 
-                        self.token_output.insert(tk.END, f"{token_type:<12} ", "type")
-                        self.token_output.insert(tk.END, f"{token_value:<20} ", "value")
-                        self.token_output.insert(tk.END, f"{line_num:<6}\n", "line")
+                        rows.append(((f"{token_type:<12} ", "type"),
+                                     (f"{token_value:<20} ", "value"),
+                                     (f"{line_num:<6}", "line")))
                         token_count += 1
 
-        self.token_output.insert(tk.END, "\n", "header")
-        self.token_output.insert(tk.END, f"总计: {token_count} 个Token\n", "header")
+        rows.append("")
+        rows.append(((f"总计: {token_count} 个Token", "header"),))
+        self.token_output.set_lines(rows)
 
     def extract_assembly(self, output):
         """提取汇编代码"""
-        self.asm_output.delete(1.0, tk.END)
-        lines = output.split('\n')
         in_asm = False
         asm_lines = []
 
-        for line in lines:
+        for line in iter_lines(output):
             # 检测汇编代码开始
-            if '汇编' in line or 'Assembly' in line or '.section' in line or 'global main' in line:
+            if ASM_START_RE.search(line):
                 in_asm = True
 
             # 检测汇编代码结束
             if in_asm:
-                if '编译完成' in line or '目标代码已保存' in line:
+                if ASM_END_RE.search(line):
                     break
                 # 跳过非汇编行
-                if not line.strip() or line.startswith('===') or line.startswith('━') or '目标代码' in line:
+                if not line.strip() or ASM_SKIP_RE.search(line):
                     continue
                 asm_lines.append(line)
 
         if asm_lines:
-            self.asm_output.insert(1.0, '\n'.join(asm_lines))
+            self.asm_output.set_lines(asm_lines)
         else:
-            self.asm_output.insert(1.0, "(未生成汇编代码)\n")
+            self.asm_output.set_lines(["(未生成汇编代码)"])
 
 
 def main():
@@ -26,6 +26,8 @@
  *   -optimize  运行代码优化
  *   -asm       生成目标代码
  *   -o <file>  指定输出文件
+ *   -pipeline  只解析一次，依次输出各阶段单独运行时的结果（供GUI使用）
+ *   -stdin     从标准输入读取源码，不需要输入文件
  */
 
 #include <iostream>
@@ -35,6 +37,7 @@
 #include <map>
 #include <vector>
 #include <iomanip>
+#include <sstream>
 #include "ast/ast.h"
 #include "semantic/semantic_analyzer.h"
 #include "codegen/code_generator.h"
@@ -65,6 +68,8 @@ void printUsage() {
     std::cout << "  -optimize      运行代码优化" << std::endl;
     std::cout << "  -asm           生成目标代码（汇编）" << std::endl;
     std::cout << "  -o <file>      指定输出文件" << std::endl;
+    std::cout << "  -pipeline      依次输出全部阶段，每个阶段以 ===BEGIN/END=== 分隔" << std::endl;
+    std::cout << "  -stdin         从标准输入读取源码" << std::endl;
     std::cout << std::endl;
     std::cout << "示例:" << std::endl;
     std::cout << "  sysc example.sy              - 编译Sys源文件" << std::endl;
@@ -169,85 +174,53 @@ void printScopeSymbols(std::shared_ptr<Scope> scope, int level) {
     }
 }
 
-int main(int argc, char* argv[]) {
-    if (argc < 2) {
-        printUsage();
-        return 1;
-    }
-
-    std::string input_file;
-    std::string output_file;
+// 各阶段的输出选项
+struct StageOptions {
     bool output_lex = false;
     bool output_ast = false;
     bool run_semantic = false;
     bool generate_ir = false;
     bool run_optimize = false;
     bool generate_asm = false;
+};
 
-    for (int i = 1; i < argc; i++) {
-        std::string arg = argv[i];
-        if (arg == "-lex") {
-            output_lex = true;
-        } else if (arg == "-ast") {
-            output_ast = true;
-        } else if (arg == "-semantic") {
-            run_semantic = true;
-        } else if (arg == "-ir") {
-            generate_ir = true;
-        } else if (arg == "-optimize") {
-            run_optimize = true;
-        } else if (arg == "-asm") {
-            generate_asm = true;
-        } else if (arg == "-o") {
-            if (i + 1 < argc) {
-                output_file = argv[++i];
-            }
-        } else if (arg[0] != '-') {
-            input_file = arg;
-        }
-    }
-
-    if (input_file.empty()) {
-        std::cerr << "错误: 未指定输入文件" << std::endl;
-        printUsage();
-        return 1;
-    }
+// -pipeline 模式依次运行的阶段，与GUI单独调用各阶段时使用的选项一致
+struct PipelineStage {
+    const char* name;
+    StageOptions options;
+};
 
-    yyin = fopen(input_file.c_str(), "r");
-    if (!yyin) {
-        std::cerr << "错误: 无法打开文件 '" << input_file << "'" << std::endl;
-        return 1;
-    }
+static const PipelineStage PIPELINE_STAGES[] = {
+    {"lex",      {true,  false, false, false, false, false}},
+    {"ast",      {false, true,  false, false, false, false}},
+    {"semantic", {false, false, true,  false, false, false}},
+    {"ir",       {false, false, false, true,  false, false}},
+    {"optimize", {false, false, false, false, true,  false}},
+    {"asm",      {false, false, false, true,  false, true}},
+};
 
+void printBanner(const std::string& input_file) {
     std::cout << "==============================================" << std::endl;
     std::cout << "           Sys编译器 v3.0" << std::endl;
     std::cout << "==============================================" << std::endl;
     std::cout << "\n输入文件: " << input_file << std::endl;
+}
 
-    if (output_lex) {
-        collect_tokens = true;
-        token_list.clear();
-    }
-
-    int parse_result = yyparse();
-    fclose(yyin);
-
-    if (parse_result != 0) {
-        std::cerr << "编译失败" << std::endl;
-        return 1;
-    }
-
-    if (output_lex && !token_list.empty()) {
+/**
+ * 在已完成语法分析的AST上运行选定的阶段并输出结果
+ * @return 0 表示成功，1 表示失败
+ */
+int runStages(const StageOptions& opts, const std::string& input_file, std::string output_file) {
+    if (opts.output_lex && !token_list.empty()) {
         std::cout << "\n==============================================" << std::endl;
         std::cout << "1. 词法分析 (Lexical Analysis)" << std::endl;
         std::cout << "==============================================" << std::endl;
         std::cout << "\n目标: 把字符流转换为Token(记号)流" << std::endl;
         std::cout << "识别关键字、标识符、常量、运算符、分隔符" << std::endl;
         printTokenTable();
-        collect_tokens = false;
     }
 
-    if (output_ast && ast_root) {
+    if (opts.output_ast && ast_root) {
         std::cout << "\n==============================================" << std::endl;
         std::cout << "2. 语法分析 (Syntax Analysis)" << std::endl;
         std::cout << "==============================================" << std::endl;
@@ -258,7 +231,7 @@ int main(int argc, char* argv[]) {
 
     std::shared_ptr<CodeGenerator> generator;
     
-    if (run_semantic && ast_root) {
+    if (opts.run_semantic && ast_root) {
         std::cout << "\n==============================================" << std::endl;
         std::cout << "3. 语义分析 (Semantic Analysis)" << std::endl;
         std::cout << "==============================================" << std::endl;
@@ -280,7 +253,7 @@ int main(int argc, char* argv[]) {
         }
     }
 
-    if ((generate_ir || run_optimize || generate_asm) && ast_root) {
+    if ((opts.generate_ir || opts.run_optimize || opts.generate_asm) && ast_root) {
         std::cout << "\n==============================================" << std::endl;
         std::cout << "4. 中间代码生成 (Intermediate Code Generation)" << std::endl;
         std::cout << "==============================================" << std::endl;
@@ -295,13 +268,13 @@ int main(int argc, char* argv[]) {
         generator = std::make_shared<CodeGenerator>(analyzer.getCurrentScope());
         generator->generate(ast_root);
         
-        if (generate_ir) {
+        if (opts.generate_ir) {
             std::cout << "\n中间代码 (三地址码):" << std::endl;
             std::cout << generator->getGeneratedCode() << std::endl;
         }
     }
 
-    if (run_optimize && generator) {
+    if (opts.run_optimize && generator) {
         std::cout << "\n==============================================" << std::endl;
         std::cout << "5. 代码优化 (Code Optimization)" << std::endl;
         std::cout << "==============================================" << std::endl;
@@ -317,13 +290,13 @@ int main(int argc, char* argv[]) {
         std::cout << "  死代码消除: " << optimizer.getDeadCodeEliminations() << " 次" << std::endl;
         std::cout << "  常量传播: 0 次" << std::endl;
         
-        if (generate_ir) {
+        if (opts.generate_ir) {
             std::cout << "\n优化后的中间代码:" << std::endl;
             std::cout << generator->getGeneratedCode() << std::endl;
         }
     }
 
-    if (generate_asm && generator) {
+    if (opts.generate_asm && generator) {
         std::cout << "\n==============================================" << std::endl;
         std::cout << "6. 目标代码生成 (Target Code Generation)" << std::endl;
         std::cout << "==============================================" << std::endl;
@@ -363,3 +336,117 @@ int main(int argc, char* argv[]) {
 
     return 0;
 }
+
+int main(int argc, char* argv[]) {
+    if (argc < 2) {
+        printUsage();
+        return 1;
+    }
+
+    std::string input_file;
+    std::string output_file;
+    StageOptions opts;
+    bool pipeline = false;
+    bool from_stdin = false;
+
+    for (int i = 1; i < argc; i++) {
+        std::string arg = argv[i];
+        if (arg == "-lex") {
+            opts.output_lex = true;
+        } else if (arg == "-ast") {
+            opts.output_ast = true;
+        } else if (arg == "-semantic") {
+            opts.run_semantic = true;
+        } else if (arg == "-ir") {
+            opts.generate_ir = true;
+        } else if (arg == "-optimize") {
+            opts.run_optimize = true;
+        } else if (arg == "-asm") {
+            opts.generate_asm = true;
+        } else if (arg == "-pipeline") {
+            pipeline = true;
+        } else if (arg == "-stdin") {
+            from_stdin = true;
+        } else if (arg == "-o") {
+            if (i + 1 < argc) {
+                output_file = argv[++i];
+            }
+        } else if (arg[0] != '-') {
+            input_file = arg;
+        }
+    }
+
+    if (from_stdin) {
+        // 源码来自标准输入，横幅中显示 <stdin>
+        input_file = "<stdin>";
+        yyin = stdin;
+        // 无法由输入文件名推出汇编文件名，未指定 -o 时写入 output.s
+        if (output_file.empty()) {
+            output_file = "output.s";
+        }
+    } else {
+        if (input_file.empty()) {
+            std::cerr << "错误: 未指定输入文件" << std::endl;
+            printUsage();
+            return 1;
+        }
+
+        yyin = fopen(input_file.c_str(), "r");
+        if (!yyin) {
+            std::cerr << "错误: 无法打开文件 '" << input_file << "'" << std::endl;
+            return 1;
+        }
+    }
+
+    if (pipeline) {
+        // 只解析一次；解析期间的错误信息先暂存，在每个阶段的标题之后输出
+        collect_tokens = true;
+        token_list.clear();
+        std::ostringstream parse_errors;
+        std::streambuf* cerr_buf = std::cerr.rdbuf(parse_errors.rdbuf());
+        int parse_result = yyparse();
+        std::cerr.rdbuf(cerr_buf);
+        fclose(yyin);
+        collect_tokens = false;
+
+        int exit_code = 0;
+        for (const auto& stage : PIPELINE_STAGES) {
+            std::cout << "===BEGIN:" << stage.name << "===" << std::endl;
+            printBanner(input_file);
+            std::cerr << parse_errors.str() << std::flush;
+
+            int stage_result;
+            if (parse_result != 0) {
+                std::cerr << "编译失败" << std::endl;
+                stage_result = 1;
+            } else {
+                stage_result = runStages(stage.options, input_file, output_file);
+            }
+            std::cout << std::flush;
+            std::cerr << std::flush;
+            std::cout << "===END:" << stage.name << ":" << stage_result << "===" << std::endl;
+            if (stage_result != 0) {
+                exit_code = 1;
+            }
+        }
+        return exit_code;
+    }
+
+    printBanner(input_file);
+
+    if (opts.output_lex) {
+        collect_tokens = true;
+        token_list.clear();
+    }
+
+    int parse_result = yyparse();
+    fclose(yyin);
+    collect_tokens = false;
+
+    if (parse_result != 0) {
+        std::cerr << "编译失败" << std::endl;
+        return 1;
+    }
+
+    return runStages(opts, input_file, output_file);
+}